@@ -1,7 +1,5 @@
 from pathlib import Path
 
-from one.api import ONE
-
 from ibl_to_nwb.converters import BrainwideMapConverter
 from ibl_to_nwb.datainterfaces import (
     BrainwideMapTrialsInterface,
@@ -13,6 +11,7 @@ from ibl_to_nwb.datainterfaces import (
     WheelInterface,
 )
 from ibl_to_nwb.testing import check_written_nwbfile_for_consistency
+from ibl_to_nwb.tools import get_one
 
 session_id = "d32876dd-8303-4720-8e7e-20678dc2fd71"
 
@@ -27,18 +26,13 @@ nwbfiles_folder_path.mkdir(exist_ok=True)
 
 # Initialize IBL (ONE) client to download processed data for this session
 one_cache_folder_path = base_path / "cache"
-ibl_client = ONE(
-    base_url="https://openalyx.internationalbrainlab.org",
-    password="international",
-    silent=True,
-    cache_dir=one_cache_folder_path,
-)
+ibl_client = get_one(cache_dir=one_cache_folder_path)
 
 # Initialize as many of each interface as we need across the streams
 data_interfaces = list()
 
 # These interfaces should always be present in source data
-data_interfaces.append(IblSortingInterface(session=session_id, cache_folder=one_cache_folder_path / "sorting"))
+data_interfaces.append(IblSortingInterface(session=session_id, one=ibl_client))
 data_interfaces.append(BrainwideMapTrialsInterface(one=ibl_client, session=session_id))
 data_interfaces.append(WheelInterface(one=ibl_client, session=session_id))
 
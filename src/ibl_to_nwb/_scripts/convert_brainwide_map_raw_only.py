@@ -1,9 +1,9 @@
+import os
 from pathlib import Path
 
-from one.api import ONE
-
 from ibl_to_nwb.converters import BrainwideMapConverter, IblSpikeGlxConverter
 from ibl_to_nwb.datainterfaces import RawVideoInterface
+from ibl_to_nwb.tools import get_alyx_metadata_cache, get_one
 
 session_id = "d32876dd-8303-4720-8e7e-20678dc2fd71"
 
@@ -18,23 +18,19 @@ nwbfiles_folder_path.mkdir(exist_ok=True)
 
 # Initialize IBL (ONE) client to download processed data for this session
 one_cache_folder_path = base_path / "cache"
-ibl_client = ONE(
-    base_url="https://openalyx.internationalbrainlab.org",
-    password="international",
-    silent=True,
-    cache_dir=one_cache_folder_path,
-)
+ibl_client = get_one(cache_dir=one_cache_folder_path)
 
 # Specify the path to the SpikeGLX files on the server but use ONE API for timestamps
 data_interfaces = []
 
 spikeglx_source_folder_path = Path("D:/example_data/ephy_testing_data/spikeglx/Noise4Sam_g0")
-spikeglx_subconverter = IblSpikeGlxConverter(folder_path=spikeglx_source_folder_path, one=ibl_client)
+spikeglx_subconverter = IblSpikeGlxConverter(
+    folder_path=spikeglx_source_folder_path, one=ibl_client, session=session_id
+)
 data_interfaces.append(spikeglx_subconverter)
 
 # Raw video takes some special handling
-metadata_retrieval = BrainwideMapConverter(one=ibl_client, session=session_id, data_interfaces=[], verbose=False)
-subject_id = metadata_retrieval.get_metadata()["Subject"]["subject_id"]
+subject_id = get_alyx_metadata_cache(one=ibl_client).get_records(session=session_id)["subject"]["nickname"]
 
 pose_estimation_files = ibl_client.list_datasets(eid=session_id, filename="*.dlc*")
 for pose_estimation_file in pose_estimation_files:
@@ -65,6 +61,7 @@ session_converter.run_conversion(
     nwbfile_path=nwbfile_path,
     metadata=metadata,
     overwrite=True,
+    compression_workers=os.cpu_count(),
 )
 
 # TODO: add some kind of raw-specific check
@@ -1,16 +1,14 @@
-from pathlib import Path
+from neuroconv.utils import dict_deep_update
 
-from neuroconv.utils import dict_deep_update, load_dict_from_file
-
-from src.ibl_to_nwb.converters._iblconverter import IblConverter
+from ._iblconverter import IblConverter
+from ..tools import load_metadata_file
 
 
 class BrainwideMapConverter(IblConverter):
     def get_metadata(self) -> dict:
         metadata = super().get_metadata()
 
-        brainwide_map_metadata_file_path = Path(__file__).parent.parent / "_metadata" / "brainwide_map_general.yml"
-        experiment_metadata = load_dict_from_file(file_path=brainwide_map_metadata_file_path)
+        experiment_metadata = load_metadata_file(file_name="brainwide_map_general.yml")
         metadata = dict_deep_update(metadata, experiment_metadata)
 
         return metadata
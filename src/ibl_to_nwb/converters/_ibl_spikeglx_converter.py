@@ -1,44 +1,109 @@
+import re
+import warnings
+from typing import Optional
+
 from neuroconv.converters import SpikeGLXConverterPipe
 from one.api import ONE
 from pydantic import DirectoryPath
 from pynwb import NWBFile
 
+from ..tools import ClockAlignedRecording, PiecewiseLinearClock
+
 
 class IblSpikeGlxConverter(SpikeGLXConverterPipe):
 
-    def __init__(self, folder_path: DirectoryPath, one: ONE) -> None:
+    def __init__(
+        self,
+        folder_path: DirectoryPath,
+        one: ONE,
+        session: Optional[str] = None,
+        alignment_tolerance: float = 1e-5,
+    ) -> None:
+        """
+        Raw SpikeGLX data of a session, aligned to the session clock with the probe sync from ONE.
+
+        Parameters
+        ----------
+        folder_path : DirectoryPath
+            Path to folder containing the NIDQ stream and subfolders containing each IMEC stream.
+        one : ONE
+        session : str, optional
+            The session ID (EID in ONE), used to load the sync of each probe. If not specified, the data is not
+            aligned.
+        alignment_tolerance : float, default: 1e-5
+            The largest difference in seconds between the sync model of a band and a regular starting time and rate
+            for the band to be written with these. Otherwise, the timestamps of every sample are written, computed
+            one buffer at a time from the sync model.
+        """
         super().__init__(folder_path=folder_path)
         self.one = one
+        self.session = session
+        self.alignment_tolerance = alignment_tolerance
+        self._interfaces_with_timestamps = set()
 
     def temporally_align_data_interfaces(self) -> None:
         """Align the raw data timestamps to the other data streams using the ONE API."""
-        # This is the syntax for aligning the raw timestamps; I cannot test this without the actual data as stored
-        # on your end, so please work with Heberto if there are any problems after uncommenting
-        # probe_to_imec_map = {
-        #     "probe00": 0,
-        #     "probe01": 1,
-        # }
-        #
-        # ephys_session_loader = EphysSessionLoader(one=self.one, eid=session_id)
-        # probes = ephys_session_loader.probes
-        # for probe_name, pid in ephys_session_loader.probes.items():
-        #     spike_sorting_loader = SpikeSortingLoader(pid=pid, one=ibl_client)
-        #
-        #     probe_index = probe_to_imec_map[probe_name]
-        #     for band in ["ap", "lf"]:
-        #         recording_interface = next(
-        #             interface
-        #             for interface in self.data_interface_objects
-        #             if f"imec{probe_index}.{band}" in interface.source_data["file_path"]
-        #         )
-        #
-        #         band_info = spike_sorting_loader.raw_electrophysiology(band=band, stream=True)
-        #         aligned_timestamps = spike_sorting_loader.samples2times(numpy.arange(0, band_info.ns), direction='forward')
-        #         recording_interface.set_aligned_timestamps(aligned_timestamps=aligned_timestamps)
-        pass
-
-    def add_to_nwbfile(self, nwbfile: NWBFile, metadata) -> None:
+        if self.session is None:
+            return
+
+        _, probe_names = self.one.eid2pid(self.session)
+        for probe_name in probe_names:
+            # The SpikeGLX stream of a probe is named in its sync dataset, such as
+            # '_spikeglx_ephysData_g0_t0.imec1.timestamps.npy' for 'imec1'; probe names need not end in its index
+            collection = f"raw_ephys_data/{probe_name}"
+            sync_datasets = self.one.list_datasets(
+                self.session, collection=collection, filename="_spikeglx_*.timestamps.npy"
+            )
+            sync_streams = [re.search(r"\.(imec\d*)\.timestamps\.npy$", dataset) for dataset in sync_datasets]
+            if len(sync_datasets) != 1 or sync_streams[0] is None:
+                warnings.warn(
+                    f"No single SpikeGLX sync dataset in '{collection}'; probe '{probe_name}' is not aligned."
+                )
+                continue
+            stream_name = sync_streams[0].group(1)
+            sync_timestamps = self.one.load_dataset(
+                self.session, dataset=sync_datasets[0].split("/")[-1], collection=collection
+            )
+
+            # The sync points are in samples of the AP band
+            ap_interface = self.data_interface_objects.get(f"{stream_name}.ap")
+            ap_sampling_frequency = (
+                ap_interface.recording_extractor.get_sampling_frequency() if ap_interface is not None else 30_000.0
+            )
+            for band in ["ap", "lf"]:
+                interface_name = f"{stream_name}.{band}"
+                recording_interface = self.data_interface_objects.get(interface_name)
+                if recording_interface is None or isinstance(
+                    recording_interface.recording_extractor, ClockAlignedRecording
+                ):
+                    continue
+
+                recording = recording_interface.recording_extractor
+                clock = PiecewiseLinearClock(
+                    sync_samples=sync_timestamps[:, 0],
+                    sync_times=sync_timestamps[:, 1],
+                    sample_scale=ap_sampling_frequency / recording.get_sampling_frequency(),
+                )
+                starting_time, rate, max_deviation = clock.get_linear_fit(
+                    number_of_frames=recording.get_num_samples(segment_index=0)
+                )
+                if max_deviation <= self.alignment_tolerance:
+                    recording_interface.recording_extractor = ClockAlignedRecording(
+                        recording=recording, starting_time=starting_time, sampling_frequency=rate
+                    )
+                else:
+                    recording_interface.recording_extractor = ClockAlignedRecording(recording=recording, clock=clock)
+                    self._interfaces_with_timestamps.add(interface_name)
+
+    def add_to_nwbfile(self, nwbfile: NWBFile, metadata, conversion_options: Optional[dict] = None) -> None:
         self.temporally_align_data_interfaces()
-        super().add_to_nwbfile(nwbfile=nwbfile, metadata=metadata)
+
+        # Bands that drift from a regular rate write the timestamps generated from their clock
+        conversion_options = dict(conversion_options or dict())
+        for interface_name in self._interfaces_with_timestamps:
+            conversion_options[interface_name] = dict(
+                conversion_options.get(interface_name, dict()), always_write_timestamps=True
+            )
+        super().add_to_nwbfile(nwbfile=nwbfile, metadata=metadata, conversion_options=conversion_options)
 
         # TODO: Add ndx-extracellular-ephys here
@@ -1,5 +1,9 @@
 """Primary base class for all IBL converters."""
 
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Literal, Optional
 
@@ -12,6 +16,9 @@ from pydantic import FilePath
 from pynwb import NWBFile
 from typing_extensions import Self
 
+from ..datainterfaces import IblStreamingApInterface, RawVideoInterface
+from ..tools import ParallelChunkWriter, get_alyx_metadata_cache
+
 
 class IblConverter(ConverterPipe):
     def __init__(self, one: ONE, session: str, data_interfaces: list, verbose: bool = True) -> Self:
@@ -28,14 +35,10 @@ class IblConverter(ConverterPipe):
     def get_metadata(self) -> dict:
         metadata = super().get_metadata()  # Aggregates from the interfaces
 
-        session_metadata_list = self.one.alyx.rest(url="sessions", action="list", id=self.session)
-        assert len(session_metadata_list) == 1, "More than one session metadata returned by query."
-        session_metadata = session_metadata_list[0]
-        assert session_metadata["id"] == self.session, "Session metadata ID does not match the requested session ID."
-
-        lab_metadata_list = self.one.alyx.rest("labs", "list", name=session_metadata["lab"])
-        assert len(lab_metadata_list) == 1, "More than one lab metadata returned by query."
-        lab_metadata = lab_metadata_list[0]
+        # Records are fetched from Alyx at most once per time to live, for all sessions converted with this client
+        alyx_records = get_alyx_metadata_cache(one=self.one).get_records(session=self.session)
+        session_metadata = alyx_records["session"]
+        lab_metadata = alyx_records["lab"]
 
         # TODO: include session_metadata['number'] in the extension attributes
         session_start_time = datetime.fromisoformat(session_metadata["start_time"])
@@ -48,9 +51,7 @@ class IblConverter(ConverterPipe):
         metadata["NWBFile"]["protocol"] = session_metadata["task_protocol"]
         # Setting publication and experiment description at project-specific converter level
 
-        subject_metadata_list = self.one.alyx.rest("subjects", "list", nickname=session_metadata["subject"])
-        assert len(subject_metadata_list) == 1, "More than one subject metadata returned by query."
-        subject_metadata = subject_metadata_list[0]
+        subject_metadata = alyx_records["subject"]
 
         subject_extra_metadata_name_mapping = dict(
             last_water_restriction="last_water_restriction",  # ISO
@@ -84,6 +85,8 @@ class IblConverter(ConverterPipe):
         backend: Optional[Literal["hdf5"]] = None,
         backend_configuration: Optional[HDF5BackendConfiguration] = None,
         conversion_options: Optional[dict] = None,
+        stream_workers: int = 0,
+        compression_workers: Optional[int] = None,
     ) -> NWBFile:
         """
         Run the NWB conversion over all the instantiated data interfaces.
@@ -112,6 +115,16 @@ class IblConverter(ConverterPipe):
         conversion_options : dict, optional
             Similar to source_data, a dictionary containing keywords for each interface for which non-default
             conversion specification is requested.
+        stream_workers : int, default: 0
+            The number of raw ephys streams to download at the same time, in background threads, while the file is
+            written. Only streams given a 'chunk_cache_folder' in their conversion options are downloaded this way,
+            each no further ahead of the writer than half the quota of the chunk cache allows.
+        compression_workers : int, optional
+            The number of threads compressing the chunks of the electrical series, such as streamed or local SpikeGLX
+            data, which are then written pre-compressed with HDF5 direct chunk writes once the rest of the file is
+            written. Requires an `nwbfile_path`. Defaults to the number of CPUs when `stream_workers` is set, so the
+            streams are downloaded and compressed at the same time; otherwise the series are compressed by HDF5 on a
+            single thread.
         """
         if metadata is None:
             metadata = self.get_metadata()
@@ -124,22 +137,80 @@ class IblConverter(ConverterPipe):
         conversion_options = conversion_options or dict()
         self.validate_conversion_options(conversion_options=conversion_options)
 
-        with make_or_load_nwbfile(
-            nwbfile_path=nwbfile_path,
-            nwbfile=nwbfile,
-            metadata=metadata,
-            overwrite=overwrite,
-            verbose=self.verbose,
-        ) as nwbfile_out:
-            nwbfile_out.subject = ibl_subject
+        # Start downloading the raw streams right away; the single writer catches up on them from the chunk cache
+        stop_event = threading.Event()
+        stream_fills = dict()
+        executor = ThreadPoolExecutor(max_workers=stream_workers) if stream_workers > 0 else None
+        if executor is not None:
             for interface_name, data_interface in self.data_interface_objects.items():
-                data_interface.add_to_nwbfile(
-                    nwbfile=nwbfile_out, metadata=metadata, **conversion_options.get(interface_name, dict())
+                interface_options = conversion_options.get(interface_name, dict())
+                if (
+                    not isinstance(data_interface, IblStreamingApInterface)
+                    or "chunk_cache_folder" not in interface_options
+                ):
+                    continue
+                stream_fills[interface_name] = executor.submit(
+                    data_interface.fill_chunk_cache,
+                    chunk_cache_folder=interface_options["chunk_cache_folder"],
+                    chunk_cache_gb=interface_options.get("chunk_cache_gb", 50.0),
+                    stub_test=interface_options.get("stub_test", False),
+                    stop_event=stop_event,
                 )
 
-            if backend_configuration is None:
-                backend_configuration = self.get_default_backend_configuration(nwbfile=nwbfile_out, backend="hdf5")
-
-            configure_backend(nwbfile=nwbfile_out, backend_configuration=backend_configuration)
+        # Download and place the videos of all cameras at the same time, before the interfaces reference them
+        video_interfaces = [
+            data_interface
+            for data_interface in self.data_interface_objects.values()
+            if isinstance(data_interface, RawVideoInterface)
+        ]
+        if video_interfaces:
+            with ThreadPoolExecutor(max_workers=len(video_interfaces)) as video_executor:
+                list(video_executor.map(RawVideoInterface.stage_video, video_interfaces))
+
+        if compression_workers is None:
+            compression_workers = os.cpu_count() if stream_workers > 0 else 0
+        chunk_writer = (
+            ParallelChunkWriter(max_workers=compression_workers)
+            if compression_workers > 0 and nwbfile_path is not None
+            else None
+        )
+        try:
+            with make_or_load_nwbfile(
+                nwbfile_path=nwbfile_path,
+                nwbfile=nwbfile,
+                metadata=metadata,
+                overwrite=overwrite,
+                verbose=self.verbose,
+            ) as nwbfile_out:
+                nwbfile_out.subject = ibl_subject
+                for interface_name, data_interface in self.data_interface_objects.items():
+                    data_interface.add_to_nwbfile(
+                        nwbfile=nwbfile_out, metadata=metadata, **conversion_options.get(interface_name, dict())
+                    )
+
+                if backend_configuration is None:
+                    backend_configuration = self.get_default_backend_configuration(nwbfile=nwbfile_out, backend="hdf5")
+
+                configure_backend(nwbfile=nwbfile_out, backend_configuration=backend_configuration)
+                if chunk_writer is not None:
+                    chunk_writer.defer(nwbfile=nwbfile_out)
+
+            # The deferred series may still read from the background downloads
+            if chunk_writer is not None:
+                chunk_writer.write(nwbfile_path=nwbfile_path)
+        finally:
+            if executor is not None:
+                stop_event.set()
+                executor.shutdown(wait=True)
+            for data_interface in self.data_interface_objects.values():
+                if isinstance(data_interface, IblStreamingApInterface):
+                    data_interface.close()
+
+        # A stream that failed to download in the background was downloaded by the writer instead
+        for interface_name, stream_fill in stream_fills.items():
+            if stream_fill.exception() is not None:
+                warnings.warn(
+                    f"Downloading stream '{interface_name}' in the background failed: {stream_fill.exception()}"
+                )
 
         return nwbfile_out
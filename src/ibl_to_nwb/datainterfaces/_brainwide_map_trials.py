@@ -1,11 +1,12 @@
-from pathlib import Path
+import warnings
+from typing import Optional
 
-from hdmf.common import VectorData
+import numpy as np
 from neuroconv.basedatainterface import BaseDataInterface
-from neuroconv.utils import load_dict_from_file
 from one.api import ONE
 from pynwb import NWBFile
-from pynwb.epoch import TimeIntervals
+
+from ..tools import build_time_intervals, get_alf_object_cache, load_metadata_file
 
 
 class BrainwideMapTrialsInterface(BaseDataInterface):
@@ -15,12 +16,12 @@ class BrainwideMapTrialsInterface(BaseDataInterface):
 
     def get_metadata(self) -> dict:
         metadata = super().get_metadata()
-        trial_metadata = load_dict_from_file(file_path=Path(__file__).parent.parent / "_metadata" / "trials.yml")
+        trial_metadata = load_metadata_file(file_name="trials.yml")
         metadata.update(trial_metadata)
         return metadata
 
     def add_to_nwbfile(self, nwbfile: NWBFile, metadata: dict):
-        trials = self.one.load_object(id=self.session, obj="trials", collection="alf")
+        trials = get_alf_object_cache(one=self.one).load_object(session=self.session, obj="trials", collection="alf")
 
         column_ordering = [
             "choice",
@@ -37,29 +38,40 @@ class BrainwideMapTrialsInterface(BaseDataInterface):
             "firstMovement_times",
         ]
         columns = [
-            VectorData(
-                name="start_time",
-                description="The beginning of the trial.",
-                data=trials["intervals"][:, 0],
-            ),
-            VectorData(
-                name="stop_time",
-                description="The end of the trial.",
-                data=trials["intervals"][:, 1],
-            ),
-        ]
-        for ibl_key in column_ordering:
-            columns.append(
-                VectorData(
-                    name=metadata["Trials"][ibl_key]["name"],
-                    description=metadata["Trials"][ibl_key]["description"],
-                    data=trials[ibl_key],
-                )
+            dict(
+                name=metadata["Trials"][ibl_key]["name"],
+                description=metadata["Trials"][ibl_key]["description"],
+                data=_cast_losslessly(
+                    data=trials[ibl_key], dtype=metadata["Trials"][ibl_key].get("dtype"), name=ibl_key
+                ),
             )
+            for ibl_key in column_ordering
+        ]
         nwbfile.add_time_intervals(
-            TimeIntervals(
+            build_time_intervals(
                 name="trials",
                 description="Trial intervals and conditions.",
+                start_time=trials["intervals"][:, 0],
+                stop_time=trials["intervals"][:, 1],
                 columns=columns,
+                start_time_description="The beginning of the trial.",
+                stop_time_description="The end of the trial.",
             )
         )
+
+
+def _cast_losslessly(data: np.ndarray, dtype: Optional[str], name: str) -> np.ndarray:
+    """Cast a column to its storage dtype from the metadata, keeping the original dtype if any value would change."""
+    data = np.asarray(data)
+    if dtype is None or data.dtype == np.dtype(dtype):
+        return data
+
+    is_castable = np.issubdtype(np.dtype(dtype), np.floating) or np.all(np.isfinite(data))
+    if is_castable:
+        with np.errstate(invalid="ignore"):  # Values out of range are caught by the round trip
+            cast_data = data.astype(dtype)
+        if np.array_equal(cast_data.astype(data.dtype), data, equal_nan=np.issubdtype(data.dtype, np.floating)):
+            return cast_data
+
+    warnings.warn(f"Trials column '{name}' cannot be stored as {dtype} without loss; keeping {data.dtype}.")
+    return data
@@ -1,13 +1,21 @@
 """The interface for loading spike sorted data via ONE access."""
 
 from collections import defaultdict
-from typing import Dict, Optional, Union
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterator, List, Literal, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 from pydantic import DirectoryPath
 from spikeinterface import BaseSorting, BaseSortingSegment
 
+if TYPE_CHECKING:
+    from iblatlas.atlas import AllenAtlas
+    from one.api import ONE
+
+    from ..tools import RegionLookupTable
+
 
 class IblSortingExtractor(BaseSorting):
     extractor_name = "IblSorting"
@@ -16,106 +24,98 @@ class IblSortingExtractor(BaseSorting):
     installation_mesg = ""
     name = "iblsorting"
 
-    def __init__(self, session: str, cache_folder: Optional[DirectoryPath] = None):
-        from brainbox.io.one import SpikeSortingLoader
-        from iblatlas.atlas import AllenAtlas
-        from iblatlas.regions import BrainRegions
-        from one.api import ONE
-
-        one = ONE(
-            base_url="https://openalyx.internationalbrainlab.org",
-            password="international",
-            silent=True,
-            cache_dir=cache_folder,
-        )
-        atlas = AllenAtlas()
-        brain_regions = BrainRegions()
+    def __init__(
+        self,
+        session: str,
+        cache_folder: Optional[DirectoryPath] = None,
+        spike_property_dtype: Literal["float64", "float32"] = "float64",
+        max_workers: int = 1,
+        memory_map_spikes: bool = False,
+        spike_sorter: str = "iblsorter",
+        one: Optional["ONE"] = None,
+    ):
+        """
+        Spike sorted data from all probes of a session, loaded via ONE.
+
+        Parameters
+        ----------
+        session : str
+            The session ID (EID in ONE).
+        cache_folder : DirectoryPath, optional
+            The ONE cache folder.
+        spike_property_dtype : "float64" or "float32", default: "float64"
+            The dtype used to hold (and write) the per-spike amplitudes and relative depths.
+        max_workers : int, default: 1
+            The number of probes whose downloaded spike sorting is loaded, grouped and annotated concurrently, each in
+            its own thread. Downloads with ONE run one probe at a time, as ONE clients are not thread-safe.
+            Unit IDs do not depend on this value.
+        memory_map_spikes : bool, default: False
+            Whether to memory-map the spike times, amplitudes and depths from the ONE cache instead of reading them.
+            The per-unit data is then gathered through an index array only when it is accessed or written, so
+            sessions with more spike data than available memory can be converted.
+        spike_sorter : str, default: "iblsorter"
+            The spike sorter whose collection is loaded, as in `SpikeSortingLoader.load_spike_sorting`.
+        one : ONE, optional
+            The ONE client to load with. If not specified, the shared OpenAlyx client for the `cache_folder` is used.
+        """
+        from ..tools import get_atlas, get_one, get_region_lookup_table
+
+        one = one or get_one(cache_dir=cache_folder)
+        atlas = get_atlas()
+        region_lookup_table = get_region_lookup_table()
 
         dataset_contents = one.list_datasets(eid=session, collection="raw_ephys_data/*")
         raw_contents = [dataset_content for dataset_content in dataset_contents if not dataset_content.endswith(".npy")]
-        probe_names = set([raw_content.split("/")[1] for raw_content in raw_contents])
+        probe_names = sorted(set([raw_content.split("/")[1] for raw_content in raw_contents]))  # Fixes unit order
+
+        probe_downloads = [
+            _download_probe_sorting(
+                one=one, session=session, probe_name=probe_name, atlas=atlas, spike_sorter=spike_sorter
+            )
+            for probe_name in probe_names
+        ]
+
+        load_probe_kwargs = dict(
+            region_lookup_table=region_lookup_table,
+            spike_property_dtype=spike_property_dtype,
+            memory_map_spikes=memory_map_spikes,
+        )
+        if max_workers == 1 or len(probe_names) < 2:
+            probe_results = [
+                _load_probe_sorting(probe_download=probe_download, **load_probe_kwargs)
+                for probe_download in probe_downloads
+            ]
+        else:
+            # Loading local files is mostly I/O and NumPy, both of which release the GIL
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                probe_results = list(
+                    executor.map(
+                        lambda probe_download: _load_probe_sorting(probe_download=probe_download, **load_probe_kwargs),
+                        probe_downloads,
+                    )
+                )
+        del probe_downloads
 
-        sorting_loaders = dict()
-        spike_times_by_id = defaultdict(list)  # Cast lists per key as arrays after assembly
-        spike_amplitudes_by_id = defaultdict(list)
-        spike_depths_by_id = defaultdict(list)
-        all_unit_properties = defaultdict(list)
+        # Merge in the fixed order of probe names so unit IDs do not depend on which probe finished loading first
+        spike_times_by_id = _SpikeTrainsByUnit()
+        ragged_property_buffers = defaultdict(list)  # Flat per-probe spike groups
+        all_unit_properties = defaultdict(list)  # Per-probe chunks of values
         cluster_ids = list()
         unit_id_per_probe_shift = 0
-        for probe_name in probe_names:
-            sorting_loader = SpikeSortingLoader(eid=session, one=one, pname=probe_name, atlas=atlas)
-            sorting_loaders.update({probe_name: sorting_loader})
-            spikes, clusters, channels = sorting_loader.load_spike_sorting()
+        for probe_result in probe_results:
+            number_of_units = len(probe_result["cluster_ids"])
             # cluster_ids.extend(list(np.array(clusters["metrics"]["cluster_id"]) + unit_id_per_probe_shift))
-            number_of_units = len(np.unique(spikes["clusters"]))
             cluster_ids.extend(list(np.arange(number_of_units).astype("int32") + unit_id_per_probe_shift))
 
-            # TODO - compare speed against iterating over unique cluster IDs + vector index search
-            for spike_cluster, spike_times, spike_amplitudes, spike_depths in zip(
-                spikes["clusters"], spikes["times"], spikes["amps"], spikes["depths"]
-            ):
-                unit_id = unit_id_per_probe_shift + spike_cluster
-                spike_times_by_id[unit_id].append(spike_times)
-                spike_amplitudes_by_id[unit_id].append(spike_amplitudes)
-                spike_depths_by_id[unit_id].append(spike_depths)
+            unit_ids = probe_result["cluster_ids"] + unit_id_per_probe_shift
+            spike_times_by_id.add_units(unit_ids=unit_ids, spike_groups=probe_result["spike_times"])
+            for property_name, spike_groups in probe_result["ragged_properties"].items():
+                ragged_property_buffers[property_name].append(spike_groups)
+            for property_name, values in probe_result["unit_properties"].items():
+                all_unit_properties[property_name].append(values)
 
             unit_id_per_probe_shift += number_of_units
-            all_unit_properties["probe_name"].extend([probe_name] * number_of_units)
-
-            # Maximum amplitude channel and locations
-            unit_id_to_channel_id = clusters["channels"]
-            all_unit_properties["maximum_amplitude_channel"].extend(unit_id_to_channel_id)
-            all_unit_properties["mean_relative_depth"].extend(clusters["depths"])
-
-            ibl_metric_key_to_property_name = dict(
-                amp_max="maximum_amplitude",
-                amp_min="minimum_amplitude",
-                amp_median="median_amplitude",
-                amp_std_dB="standard_deviation_amplitude",
-                contamination="contamination",
-                contamination_alt="alternative_contamination",
-                drift="drift",
-                missed_spikes_est="missed_spikes_estimate",
-                noise_cutoff="noise_cutoff",
-                presence_ratio="presence_ratio",
-                presence_ratio_std="presence_ratio_standard_deviation",
-                slidingRP_viol="sliding_refractory_period_violation",
-                spike_count="spike_count",
-                firing_rate="firing_rate",
-                label="label",
-                cluster_uuid="cluster_uuid",
-                cluster_id="cluster_id",
-            )
-
-            cluster_metrics = clusters["metrics"].reset_index(drop=True).join(pd.DataFrame(clusters["uuids"]))
-            cluster_metrics.rename(columns={"uuids": "cluster_uuid"}, inplace=True)
-
-            for ibl_metric_key, property_name in ibl_metric_key_to_property_name.items():
-                all_unit_properties[property_name].extend(list(cluster_metrics[ibl_metric_key]))
-
-            if sorting_loader.histology in ["alf", "resolved"]:  # Assume if one probe has histology, the other does too
-                channel_id_to_allen_regions = channels["acronym"]
-                channel_id_to_atlas_id = channels["atlas_id"]
-
-                all_unit_properties["allen_location"].extend(list(channel_id_to_allen_regions[unit_id_to_channel_id]))
-                all_unit_properties["beryl_location"].extend(
-                    list(
-                        brain_regions.id2acronym(
-                            atlas_id=channel_id_to_atlas_id[unit_id_to_channel_id], mapping="Beryl"
-                        )
-                    )
-                )
-                all_unit_properties["cosmos_location"].extend(
-                    list(
-                        brain_regions.id2acronym(
-                            atlas_id=channel_id_to_atlas_id[unit_id_to_channel_id], mapping="Cosmos"
-                        )
-                    )
-                )
-
-        for unit_id in spike_times_by_id:  # Cast as arrays for fancy indexing
-            spike_times_by_id[unit_id] = np.array(spike_times_by_id[unit_id])
-            spike_amplitudes_by_id[unit_id] = np.array(spike_amplitudes_by_id[unit_id])
+        del probe_results
 
         sampling_frequency = 30000.0  # Hard-coded to match SpikeGLX probe
         BaseSorting.__init__(self, sampling_frequency=sampling_frequency, unit_ids=list(spike_times_by_id.keys()))
@@ -125,27 +125,337 @@ class IblSortingExtractor(BaseSorting):
         )
         self.add_sorting_segment(sorting_segment)
 
-        # I know it looks weird, but it's the only way I could find
-        self.set_property(
-            key="spike_amplitudes",
-            values=np.array(list(spike_amplitudes_by_id.values()), dtype=object),
-            ids=cluster_ids,
-        )
-        self.set_property(
-            key="spike_relative_depths",
-            values=np.array(list(spike_depths_by_id.values()), dtype=object),
-            ids=cluster_ids,
+        # Per-spike properties are kept in the VectorData/VectorIndex layout of NWB rather than as object arrays
+        # so the interface can write them as whole columns; see `get_ragged_property`
+        self._ragged_properties = dict()
+        for property_name, probe_buffers in ragged_property_buffers.items():
+            probe_index_shifts = np.cumsum([0] + [len(spike_groups) for spike_groups in probe_buffers[:-1]])
+            index = np.concatenate(
+                [
+                    spike_groups.cluster_ends + index_shift
+                    for spike_groups, index_shift in zip(probe_buffers, probe_index_shifts)
+                ]
+            )
+            if memory_map_spikes:
+                data = _ConcatenatedSpikeGroups(probe_spike_groups=list(probe_buffers))
+            else:
+                data = np.concatenate([spike_groups.values for spike_groups in probe_buffers])
+            self._ragged_properties[property_name] = (data, index)
+            probe_buffers.clear()
+
+        for property_name, probe_values in all_unit_properties.items():
+            self.set_property(key=property_name, values=np.concatenate(probe_values), ids=cluster_ids)
+
+    def get_ragged_property_keys(self) -> list:
+        """The names of the per-spike unit properties, which are not stored as regular properties."""
+        return list(self._ragged_properties.keys())
+
+    def get_ragged_property(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retrieve a per-spike unit property in the flat layout of an NWB VectorData and VectorIndex pair.
+
+        Parameters
+        ----------
+        key : str
+            The name of the property; one of `get_ragged_property_keys()`.
+
+        Returns
+        -------
+        data : numpy.ndarray or array-like
+            The values of all spikes, grouped by unit in the order of `unit_ids`.
+            When spikes are memory-mapped, this is an array-like that gathers values on indexing.
+        index : numpy.ndarray
+            The exclusive end position in `data` of each unit.
+        """
+        return self._ragged_properties[key]
+
+
+def _download_probe_sorting(
+    one: "ONE", session: str, probe_name: str, atlas: "AllenAtlas", spike_sorter: str = "iblsorter"
+) -> dict:
+    """
+    Download the spikes and clusters of a single probe, and load its channels.
+
+    This is the only part of loading a probe that uses the ONE client, whose cache tables and REST session are not
+    thread-safe, so it runs for one probe at a time.
+
+    Returns
+    -------
+    probe_download : dict
+        The 'probe_name', its 'channels' and 'histology', and the local 'cluster_files' and 'spike_files' without a
+        namespace.
+    """
+    from brainbox.io.one import SpikeSortingLoader
+    from one.alf.path import ALFPath
+
+    from ..tools import get_probe_channels
+
+    # The channels are shared with the recording interfaces of the same probe, so only spikes and clusters load here
+    channels, histology = get_probe_channels(one=one, session=session, probe_name=probe_name, spike_sorter=spike_sorter)
+    sorting_loader = SpikeSortingLoader(eid=session, one=one, pname=probe_name, atlas=atlas, spike_sorter=spike_sorter)
+    sorting_loader.download_spike_sorting(objects=["spikes", "clusters"])
+
+    # As in `SpikeSortingLoader.load_spike_sorting`, keep the files without a namespace (e.g., not '_av_clusters.*')
+    cluster_files, spike_files = (
+        sorting_loader.filter_files_by_namespace(list(map(ALFPath, sorting_loader.files[obj])), namespace=None)
+        for obj in ["clusters", "spikes"]
+    )
+    return dict(
+        probe_name=probe_name,
+        channels=channels,
+        histology=histology,
+        cluster_files=cluster_files,
+        spike_files=spike_files,
+    )
+
+
+def _load_probe_sorting(
+    probe_download: dict,
+    region_lookup_table: "RegionLookupTable",
+    spike_property_dtype: str,
+    memory_map_spikes: bool = False,
+) -> dict:
+    """
+    Load, group and annotate the downloaded spike sorting of a single probe.
+
+    Probes are independent of each other and only their local files are read, so this may run concurrently for all
+    probes of a session.
+
+    Parameters
+    ----------
+    probe_download : dict
+        As returned by `_download_probe_sorting`.
+
+    Returns
+    -------
+    probe_result : dict
+        The ascending 'cluster_ids' with spikes, the 'spike_times' and per-spike 'ragged_properties' as spike groups
+        and the per-unit 'unit_properties'.
+    """
+    from one.alf import io as alfio
+
+    probe_name, channels, histology = (probe_download[key] for key in ["probe_name", "channels", "histology"])
+    cluster_files, spike_files = probe_download["cluster_files"], probe_download["spike_files"]
+
+    # Keys are the ALF attributes, without any UUID or other extra parts of the file names
+    clusters = alfio.load_object(cluster_files, short_keys=True)
+    if memory_map_spikes:
+        spikes = {
+            file_path.attribute: np.load(file=file_path, mmap_mode="r")
+            for file_path in spike_files
+            if file_path.suffix == ".npy" and not file_path.timescale
+        }
+    else:
+        spikes = alfio.load_object(spike_files, short_keys=True)
+
+    cluster_ids_with_spikes, cluster_ends, spike_order = _sort_spikes_by_cluster(
+        spike_clusters=spikes["clusters"], spike_times=spikes["times"]
+    )
+    ibl_key_to_spike_feature = dict(times="times", amps="spike_amplitudes", depths="spike_relative_depths")
+    spike_features = dict()
+    for ibl_key, feature_name in ibl_key_to_spike_feature.items():
+        dtype = spikes[ibl_key].dtype if feature_name == "times" else spike_property_dtype
+        if memory_map_spikes:  # Only the index array is held; values stay in the mapped file until accessed
+            spike_features[feature_name] = _SpikeGroups(
+                values=spikes[ibl_key], cluster_ends=cluster_ends, spike_order=spike_order, dtype=dtype
+            )
+        else:
+            sorted_values = spikes[ibl_key][spike_order].astype(dtype, copy=False)
+            spike_features[feature_name] = _SpikeGroups(values=sorted_values, cluster_ends=cluster_ends)
+    del spikes
+    number_of_units = len(cluster_ids_with_spikes)
+
+    unit_properties = defaultdict(list)
+    unit_properties["probe_name"].extend([probe_name] * number_of_units)
+
+    # Maximum amplitude channel and locations
+    unit_id_to_channel_id = clusters["channels"]
+    unit_properties["maximum_amplitude_channel"].extend(unit_id_to_channel_id)
+    unit_properties["mean_relative_depth"].extend(clusters["depths"])
+
+    ibl_metric_key_to_property_name = dict(
+        amp_max="maximum_amplitude",
+        amp_min="minimum_amplitude",
+        amp_median="median_amplitude",
+        amp_std_dB="standard_deviation_amplitude",
+        contamination="contamination",
+        contamination_alt="alternative_contamination",
+        drift="drift",
+        missed_spikes_est="missed_spikes_estimate",
+        noise_cutoff="noise_cutoff",
+        presence_ratio="presence_ratio",
+        presence_ratio_std="presence_ratio_standard_deviation",
+        slidingRP_viol="sliding_refractory_period_violation",
+        spike_count="spike_count",
+        firing_rate="firing_rate",
+        label="label",
+        cluster_uuid="cluster_uuid",
+        cluster_id="cluster_id",
+    )
+
+    cluster_metrics = clusters["metrics"].reset_index(drop=True).join(pd.DataFrame(clusters["uuids"]))
+    cluster_metrics.rename(columns={"uuids": "cluster_uuid"}, inplace=True)
+
+    for ibl_metric_key, property_name in ibl_metric_key_to_property_name.items():
+        unit_properties[property_name].extend(list(cluster_metrics[ibl_metric_key]))
+
+    if histology in ["alf", "resolved"]:  # Assume if one probe has histology, the other does too
+        channel_id_to_allen_regions = channels["acronym"]
+        unit_atlas_ids = channels["atlas_id"][unit_id_to_channel_id]
+
+        unit_properties["allen_location"] = np.asarray(channel_id_to_allen_regions[unit_id_to_channel_id], dtype=str)
+        unit_properties["beryl_location"] = region_lookup_table.get_acronyms(atlas_ids=unit_atlas_ids, mapping="Beryl")
+        unit_properties["cosmos_location"] = region_lookup_table.get_acronyms(
+            atlas_ids=unit_atlas_ids, mapping="Cosmos"
         )
 
-        for property_name, values in all_unit_properties.items():
-            self.set_property(key=property_name, values=values, ids=cluster_ids)
+    return dict(
+        cluster_ids=cluster_ids_with_spikes,
+        spike_times=spike_features.pop("times"),
+        ragged_properties=spike_features,
+        unit_properties=unit_properties,
+    )
+
+
+def _sort_spikes_by_cluster(
+    spike_clusters: np.ndarray, spike_times: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Order the spikes of a probe by cluster using a single stable sort over the whole probe.
+
+    Spikes keep their temporal order within each cluster.
+
+    Parameters
+    ----------
+    spike_clusters : numpy.ndarray
+        The cluster ID of each spike.
+    spike_times : numpy.ndarray
+        The time of each spike; only used to break ties when the spikes are not already in temporal order.
+
+    Returns
+    -------
+    cluster_ids : numpy.ndarray
+        The ascending cluster IDs that have at least one spike.
+    cluster_ends : numpy.ndarray
+        The exclusive end position of each cluster in `cluster_ids` within the reordered spikes.
+    spike_order : numpy.ndarray
+        The indices that reorder any per-spike array to be contiguous per cluster.
+    """
+    spike_clusters = np.asarray(spike_clusters)
+    if spike_clusters.size == 0:
+        empty_index = np.empty(shape=0, dtype="int64")
+        return empty_index, empty_index, empty_index
+
+    if np.any(spike_times[1:] < spike_times[:-1]):
+        spike_order = np.lexsort((spike_times, spike_clusters))
+    else:
+        spike_order = np.argsort(spike_clusters, kind="stable")
+    spike_counts = np.bincount(spike_clusters)
+    cluster_ids = np.flatnonzero(spike_counts)
+    cluster_ends = np.cumsum(spike_counts[cluster_ids])
+
+    return cluster_ids, cluster_ends, spike_order
+
+
+class _SpikeGroups:
+    """
+    The values of one per-spike feature of a probe, grouped by cluster.
+
+    If `spike_order` is given, the values stay in their original (e.g., memory-mapped) order and are gathered through
+    the index array on access; otherwise they must already be contiguous per cluster and groups are views.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        cluster_ends: np.ndarray,
+        spike_order: Optional[np.ndarray] = None,
+        dtype: Optional[np.dtype] = None,
+    ):
+        self.values = values
+        self.cluster_ends = cluster_ends
+        self.spike_order = spike_order
+        self.dtype = np.dtype(dtype or values.dtype)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, positions: Union[slice, np.ndarray]) -> np.ndarray:
+        """Retrieve values by position in the cluster-grouped order."""
+        if self.spike_order is None:
+            return self.values[positions]
+        return self.values[self.spike_order[positions]].astype(self.dtype, copy=False)
+
+    def get_group(self, group_index: int) -> np.ndarray:
+        start = self.cluster_ends[group_index - 1] if group_index > 0 else 0
+        return self[start : self.cluster_ends[group_index]]
+
+
+class _ConcatenatedSpikeGroups:
+    """Read-only array-like over the spike groups of several probes, in probe order; used when memory-mapping."""
+
+    def __init__(self, probe_spike_groups: List[_SpikeGroups]):
+        self._probe_spike_groups = probe_spike_groups
+        self._probe_ends = np.cumsum([len(spike_groups) for spike_groups in probe_spike_groups])
+        self.dtype = probe_spike_groups[0].dtype if probe_spike_groups else np.dtype("float64")
+        self.shape = (int(self._probe_ends[-1]) if probe_spike_groups else 0,)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key: Union[slice, np.ndarray]) -> np.ndarray:
+        """Gather values for a slice, a boolean mask or ascending positions."""
+        if isinstance(key, slice):
+            positions = np.arange(*key.indices(len(self)))
+        else:
+            positions = np.asarray(key)
+            positions = np.flatnonzero(positions) if positions.dtype == bool else positions
+
+        values = np.empty(shape=len(positions), dtype=self.dtype)
+        probe_bounds = np.searchsorted(positions, np.concatenate(([0], self._probe_ends)))
+        for probe_index, spike_groups in enumerate(self._probe_spike_groups):
+            start, stop = probe_bounds[probe_index], probe_bounds[probe_index + 1]
+            probe_start = self._probe_ends[probe_index] - len(spike_groups)
+            values[start:stop] = spike_groups[positions[start:stop] - probe_start]
+        return values
+
+
+class _SpikeTrainsByUnit(Mapping):
+    """Maps unit IDs to their spike times without holding a separate array per unit."""
+
+    def __init__(self):
+        self._unit_locations = dict()
+
+    def add_units(self, unit_ids: np.ndarray, spike_groups: _SpikeGroups) -> None:
+        self._unit_locations.update({unit_id: (spike_groups, index) for index, unit_id in enumerate(unit_ids)})
+
+    def __getitem__(self, unit_id: int) -> np.ndarray:
+        spike_groups, group_index = self._unit_locations[unit_id]
+        return spike_groups.get_group(group_index=group_index)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._unit_locations)
+
+    def __len__(self) -> int:
+        return len(self._unit_locations)
 
 
 class IblSortingSegment(BaseSortingSegment):
-    def __init__(self, sampling_frequency: float, spike_times_by_id: Dict[int, np.ndarray]):
+    def __init__(self, sampling_frequency: float, spike_times_by_id: Mapping[int, np.ndarray]):
+        """
+        Spike trains of all units, stored as the original spike times in seconds.
+
+        Parameters
+        ----------
+        sampling_frequency : float
+            The sampling frequency used to express spike times as frames.
+        spike_times_by_id : mapping of numpy.ndarray
+            The spike times of each unit, in seconds. Each array must be sorted in ascending order.
+        """
         BaseSortingSegment.__init__(self)
         self._sampling_frequency = sampling_frequency
         self._spike_times_by_id = spike_times_by_id
+        self._spike_frames_by_id = dict()  # Filled on first frame-based access of each unit
 
     def get_unit_spike_train(
         self,
@@ -153,10 +463,30 @@ class IblSortingSegment(BaseSortingSegment):
         start_frame: Union[int, None] = None,
         end_frame: Union[int, None] = None,
     ) -> np.ndarray:
-        times = np.array(self._spike_times_by_id[unit_id])  # Make a copy for possible mutation below
-        frames = (times * self._sampling_frequency).astype(int)
-        if start_frame is not None:
-            frames = frames[frames >= start_frame]
-        if end_frame is not None:
-            frames = frames[frames < end_frame]
-        return frames
+        frames = self._spike_frames_by_id.get(unit_id, None)
+        if frames is None:
+            frames = (self._spike_times_by_id[unit_id] * self._sampling_frequency).astype("int64")
+            self._spike_frames_by_id[unit_id] = frames
+
+        return frames[_get_window_slice(sorted_values=frames, start=start_frame, end=end_frame)]
+
+    def get_unit_spike_train_in_seconds(
+        self,
+        unit_id: int,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> np.ndarray:
+        # Used by SpikeInterface when spike times are requested, so the NWB units table receives the original values
+        # rather than a round trip through integer frames
+        times = self._spike_times_by_id[unit_id]
+
+        return times[_get_window_slice(sorted_values=times, start=start_time, end=end_time)]
+
+
+def _get_window_slice(
+    sorted_values: np.ndarray, start: Union[float, None] = None, end: Union[float, None] = None
+) -> slice:
+    """Binary search for the half-open window [start, end) of a sorted array, avoiding boolean mask copies."""
+    start_index = None if start is None else int(np.searchsorted(sorted_values, start, side="left"))
+    end_index = None if end is None else int(np.searchsorted(sorted_values, end, side="left"))
+    return slice(start_index, end_index)
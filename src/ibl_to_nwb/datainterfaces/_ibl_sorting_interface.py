@@ -1,13 +1,16 @@
 """The interface for loading spike sorted data via ONE access."""
 
-from pathlib import Path
+from typing import List, Literal, Optional
 
+import numpy as np
+from hdmf.data_utils import GenericDataChunkIterator
 from neuroconv.datainterfaces.ecephys.basesortingextractorinterface import (
     BaseSortingExtractorInterface,
 )
-from neuroconv.utils import load_dict_from_file
+from pynwb import NWBFile
 
 from ._ibl_sorting_extractor import IblSortingExtractor
+from ..tools import load_metadata_file
 
 
 class IblSortingInterface(BaseSortingExtractorInterface):
@@ -16,7 +19,7 @@ class IblSortingInterface(BaseSortingExtractorInterface):
     def get_metadata(self) -> dict:
         metadata = super().get_metadata()
 
-        ecephys_metadata = load_dict_from_file(file_path=Path(__file__).parent.parent / "_metadata" / "ecephys.yml")
+        ecephys_metadata = load_metadata_file(file_name="ecephys.yml")
 
         metadata.update(Ecephys=dict())
         metadata["Ecephys"].update(UnitProperties=ecephys_metadata["Ecephys"]["UnitProperties"])
@@ -27,3 +30,98 @@ class IblSortingInterface(BaseSortingExtractorInterface):
                 )
 
         return metadata
+
+    def add_to_nwbfile(
+        self,
+        nwbfile: NWBFile,
+        metadata: Optional[dict] = None,
+        stub_test: bool = False,
+        write_ecephys_metadata: bool = False,
+        write_as: Literal["units", "processing"] = "units",
+        units_name: str = "units",
+        units_description: str = "Autogenerated by neuroconv.",
+        unit_electrode_indices: Optional[List[List[int]]] = None,
+    ) -> None:
+        """
+        Add the units of this probe to the NWB file, with their per-spike properties as ragged columns.
+
+        Parameters
+        ----------
+        nwbfile : NWBFile
+        metadata : dict, optional
+        stub_test : bool, default: False
+        write_ecephys_metadata : bool, default: False
+        write_as : "units" or "processing", default: "units"
+        units_name : str, default: "units"
+        units_description : str, default: "Autogenerated by neuroconv."
+        unit_electrode_indices : list of lists of int, optional
+            See `BaseSortingExtractorInterface.add_to_nwbfile`.
+        """
+        if metadata is None:
+            metadata = self.get_metadata()
+        super().add_to_nwbfile(
+            nwbfile=nwbfile,
+            metadata=metadata,
+            stub_test=stub_test,
+            write_ecephys_metadata=write_ecephys_metadata,
+            write_as=write_as,
+            units_name=units_name,
+            units_description=units_description,
+            unit_electrode_indices=unit_electrode_indices,
+        )
+
+        # The per-spike properties are not regular extractor properties; write them as whole ragged columns
+        units_table = nwbfile.units if write_as == "units" else nwbfile.processing["ecephys"][units_name]
+
+        number_of_units = self.sorting_extractor.get_num_units()
+        number_of_previous_units = len(units_table) - number_of_units
+        spike_times_ends = np.asarray(units_table["spike_times"].data)
+        previous_end = spike_times_ends[number_of_previous_units - 1] if number_of_previous_units > 0 else 0
+        written_spike_counts = np.diff(spike_times_ends[number_of_previous_units:], prepend=previous_end)
+
+        property_descriptions = {
+            column["name"]: column["description"] for column in metadata["Ecephys"].get("UnitProperties", [])
+        }
+        for property_name in self.sorting_extractor.get_ragged_property_keys():
+            data, index = self.sorting_extractor.get_ragged_property(key=property_name)
+            data, index = _truncate_ragged_rows(data=data, index=index, row_lengths=written_spike_counts)
+            if not isinstance(data, np.ndarray):  # Memory-mapped spikes are gathered one buffer at a time on write
+                data = _RaggedPropertyDataChunkIterator(data=data)
+
+            units_table.add_column(
+                name=property_name,
+                description=property_descriptions.get(property_name, "No description."),
+                data=data,
+                index=np.concatenate((np.zeros(shape=number_of_previous_units, dtype=index.dtype), index)),
+            )
+
+
+def _truncate_ragged_rows(data: np.ndarray, index: np.ndarray, row_lengths: np.ndarray) -> tuple:
+    """Keep only the leading `row_lengths` values of each row of a ragged array, such as when writing a stub."""
+    full_row_lengths = np.diff(index, prepend=0)
+    if np.array_equal(full_row_lengths, row_lengths):
+        return data, index
+
+    position_in_row = np.arange(len(data)) - np.repeat(index - full_row_lengths, full_row_lengths)
+    values_to_keep = position_in_row < np.repeat(row_lengths, full_row_lengths)
+    return data[values_to_keep], np.cumsum(row_lengths)
+
+
+class _RaggedPropertyDataChunkIterator(GenericDataChunkIterator):
+    """Write a flat array-like (such as memory-mapped spike data gathered by index) buffer by buffer."""
+
+    def __init__(self, data, **kwargs):
+        self._data = data
+        super().__init__(**kwargs)
+
+    def __len__(self) -> int:  # Required by DynamicTable.add_column when an index is given
+        return len(self._data)
+
+    def _get_data(self, selection: tuple) -> np.ndarray:
+        return self._data[selection[0]]
+
+    def _get_maxshape(self) -> tuple:
+        return (len(self._data),)
+
+    def _get_dtype(self) -> np.dtype:
+        return self._data.dtype
@@ -1,18 +1,35 @@
 """Data interface wrapper around the SpikeInterface extractor - also sets atlas information."""
 
-from pathlib import Path
+import inspect
+import threading
+from contextlib import ExitStack
+from typing import Literal, Optional
 
 import numpy as np
-from brainbox.io.one import SpikeSortingLoader
-from iblatlas.atlas import AllenAtlas
-from iblatlas.regions import BrainRegions
 from neuroconv.datainterfaces.ecephys.baserecordingextractorinterface import (
     BaseRecordingExtractorInterface,
 )
-from neuroconv.utils import get_schema_from_hdmf_class, load_dict_from_file
-from one.api import ONE
+from neuroconv.utils import get_schema_from_hdmf_class
+from pydantic import DirectoryPath
+from pynwb import NWBFile
 from pynwb.ecephys import ElectricalSeries
 
+from ..tools import (
+    ChunkCachedRecording,
+    LocalCbinRecording,
+    ParallelDecompressor,
+    PrefetchingRecording,
+    get_atlas,
+    get_file_streamer,
+    get_local_cbin_file_path,
+    get_one,
+    get_probe_channels,
+    get_region_lookup_table,
+    get_streamed_chunk_cache,
+    get_streaming_iterator_shapes,
+    load_metadata_file,
+)
+
 
 class IblStreamingApInterface(BaseRecordingExtractorInterface):
     ExtractorName = "IblStreamingRecordingExtractor"
@@ -26,6 +43,10 @@ class IblStreamingApInterface(BaseRecordingExtractorInterface):
     def __init__(self, **kwargs):
         self.session = kwargs["session"]
         self.stream_name = kwargs["stream_name"]
+        self.one = kwargs.pop("one", None) or get_one(cache_dir=kwargs.get("cache_folder", None))
+        self._readers = ExitStack()  # Closed once the traces added by `add_to_nwbfile` have been written
+        if "one" in inspect.signature(self.get_extractor().__init__).parameters:
+            kwargs.update(one=self.one)  # Only newer versions of the extractor accept a client to reuse
         super().__init__(**kwargs)
 
         # Determine es_key and ElectrodeGroup
@@ -42,22 +63,15 @@ class IblStreamingApInterface(BaseRecordingExtractorInterface):
             self.recording_extractor.delete_property(key="shank")
 
         # Set Atlas info
-        one = ONE(
-            base_url="https://openalyx.internationalbrainlab.org",
-            password="international",
-            silent=True,
-            cache_dir=kwargs.get("cache_folder", None),
-        )
-        atlas = AllenAtlas()
-        brain_regions = BrainRegions()
+        atlas = get_atlas()
+        region_lookup_table = get_region_lookup_table()
 
-        spike_sorting_loader = SpikeSortingLoader(
-            eid=self.session, one=one, pname=self.stream_name.split(".")[0], atlas=atlas
+        channels, histology = get_probe_channels(
+            one=self.one, session=self.session, probe_name=self.stream_name.split(".")[0]
         )
-        _, _, channels = spike_sorting_loader.load_spike_sorting()
 
         self.has_histology = False
-        if spike_sorting_loader.histology not in ["alf", "resolved"]:
+        if histology not in ["alf", "resolved"]:
             return
         self.has_histology = True
 
@@ -85,11 +99,11 @@ class IblStreamingApInterface(BaseRecordingExtractorInterface):
             )  # Acronyms are symmetric, do not differentiate hemisphere
             self.recording_extractor.set_property(
                 key="beryl_location",
-                values=list(brain_regions.id2acronym(atlas_id=channels["atlas_id"], mapping="Beryl")),
+                values=region_lookup_table.get_acronyms(atlas_ids=channels["atlas_id"], mapping="Beryl"),
             )
             self.recording_extractor.set_property(
                 key="cosmos_location",
-                values=list(brain_regions.id2acronym(atlas_id=channels["atlas_id"], mapping="Cosmos")),
+                values=region_lookup_table.get_acronyms(atlas_ids=channels["atlas_id"], mapping="Cosmos"),
             )
 
     def get_metadata_schema(self) -> dict:
@@ -104,7 +118,7 @@ class IblStreamingApInterface(BaseRecordingExtractorInterface):
     def get_metadata(self) -> dict:
         metadata = super().get_metadata()
 
-        ecephys_metadata = load_dict_from_file(file_path=Path(__file__).parent.parent / "_metadata" / "ecephys.yml")
+        ecephys_metadata = load_metadata_file(file_name="ecephys.yml")
 
         metadata["Ecephys"].update({self.es_key: ecephys_metadata["Ecephys"]["ElectricalSeriesAp"]})
         if len(self.available_streams) > 1:
@@ -140,27 +154,186 @@ class IblStreamingApInterface(BaseRecordingExtractorInterface):
 
         return metadata
 
-    def add_to_nwbfile(self, iterator_opts: dict, progress_position: int, **kwargs):
+    def add_to_nwbfile(
+        self,
+        nwbfile: NWBFile,
+        metadata: Optional[dict] = None,
+        stub_test: bool = False,
+        starting_time: Optional[float] = None,
+        write_as: Literal["raw", "lfp", "processed"] = "raw",
+        write_electrical_series: bool = True,
+        iterator_type: Optional[str] = "v2",
+        iterator_opts: Optional[dict] = None,
+        always_write_timestamps: bool = False,
+        progress_position: int = 0,
+        prefetch_buffers: int = 2,
+        chunk_cache_folder: Optional[DirectoryPath] = None,
+        chunk_cache_gb: float = 50.0,
+        decompression_workers: int = 0,
+        memory_budget_gb: Optional[float] = None,
+    ):
+        """
+        Add the streamed traces and electrodes of this probe band to the NWB file.
+
+        Parameters
+        ----------
+        nwbfile : NWBFile
+        metadata : dict, optional
+        stub_test : bool, default: False
+        starting_time : float, optional
+        write_as : "raw", "lfp" or "processed", default: "raw"
+        write_electrical_series : bool, default: True
+        iterator_type : str, default: "v2"
+            See `BaseRecordingExtractorInterface.add_to_nwbfile`.
+        iterator_opts : dict, optional
+            Options for the data chunk iterator, which override the defaults of this interface.
+        always_write_timestamps : bool, default: False
+        progress_position : int, default: 0
+            The line of the progress bar of this stream, to display several streams at once.
+        prefetch_buffers : int, default: 2
+            The number of buffers to fetch in the background while the current one is being written.
+            Set to 0 to fetch each buffer only when it is written.
+        chunk_cache_folder : DirectoryPath, optional
+            A folder to keep the downloaded compressed chunks in, so re-running the conversion reads them from disk.
+            Can be shared by all streams and sessions. If not specified, chunks are downloaded on every run.
+        chunk_cache_gb : float, default: 50.0
+            The size of the chunk cache above which the least recently read chunks are removed.
+        decompression_workers : int, default: 0
+            The number of processes decoding the compressed chunks of each buffer in parallel; requires a
+            `chunk_cache_folder`, unless the whole '.cbin' file of the stream is in the local cache of ONE, in which
+            case it is read from there. By default, chunks are decoded one after another in the reading thread.
+        memory_budget_gb : float, optional
+            The memory this stream may use for its buffers. If specified, the buffer and chunk shapes are chosen to
+            fit it and to align with the remote chunks, replacing the default `buffer_gb` of 0.1; shapes given in
+            `iterator_opts` still take precedence. The shapes written are recorded in `self.iterator_shapes`.
+        """
         # The buffer and chunk shapes must be set explicitly for good performance with the streaming
         # Otherwise, the default buffer/chunk shapes might re-request the same data packet multiple times
-        # chunk_frames = 100 if kwargs.get("stub_test", False) else 30_000
-        # buffer_frames = 100 if kwargs.get("stub_test", False) else 5 * 30_000
-        kwargs.update(
-            iterator_opts=dict(
-                display_progress=True,
-                # chunk_shape=(chunk_frames, 16),  # ~1 MB
-                # buffer_shape=(buffer_frames, 384),  # 100 MB
-                buffer_gb=0.1,
-                progress_bar_options=dict(
-                    desc=f"Converting stream '{self.stream_name}' session '{self.session}'...",
-                    position=kwargs.get("progress_position", 0),
-                ),
+        # chunk_frames = 100 if stub_test else 30_000
+        # buffer_frames = 100 if stub_test else 5 * 30_000
+        streaming_iterator_opts = dict(
+            display_progress=True,
+            # chunk_shape=(chunk_frames, 16),  # ~1 MB
+            # buffer_shape=(buffer_frames, 384),  # 100 MB
+            buffer_gb=0.1,
+            progress_bar_options=dict(
+                desc=f"Converting stream '{self.stream_name}' session '{self.session}'...",
+                position=progress_position,
+            ),
+        )
+        if memory_budget_gb is not None:
+            remote_chunk_bounds = get_file_streamer(recording=self.recording_extractor).chunks["chunk_bounds"]
+            recording = self.subset_recording(stub_test=True) if stub_test else self.recording_extractor
+            buffer_shape, chunk_shape = get_streaming_iterator_shapes(
+                number_of_frames=recording.get_num_samples(segment_index=0),
+                number_of_channels=self.recording_extractor.get_num_channels(),
+                remote_chunk_frames=int(remote_chunk_bounds[1] - remote_chunk_bounds[0]),
+                bytes_per_sample=self.recording_extractor.get_dtype().itemsize,
+                memory_budget_gb=memory_budget_gb,
+                buffers_in_memory=prefetch_buffers + 2,  # Written, prefetched, and a working copy while decoding
+            )
+            streaming_iterator_opts.pop("buffer_gb")
+            streaming_iterator_opts.update(buffer_shape=buffer_shape, chunk_shape=chunk_shape)
+        streaming_iterator_opts.update(iterator_opts or dict())
+        self.iterator_shapes = {
+            key: streaming_iterator_opts[key]
+            for key in ["buffer_shape", "chunk_shape"]
+            if key in streaming_iterator_opts
+        }
+
+        local_file_path = get_local_cbin_file_path(recording=self.recording_extractor)
+        if decompression_workers > 0 and chunk_cache_folder is None and local_file_path is None:
+            raise ValueError("Decoding chunks in parallel requires a 'chunk_cache_folder'.")
+
+        # The traces are only read when the file is written, through the recording held by the data chunk iterator
+        recording_extractor = self.recording_extractor
+        decompressor = (
+            self._readers.enter_context(ParallelDecompressor(max_workers=decompression_workers))
+            if decompression_workers > 0
+            else None
+        )
+        if local_file_path is not None:  # Already downloaded in full, such as by another pipeline
+            self.recording_extractor = LocalCbinRecording(
+                recording=self.recording_extractor, file_path=local_file_path, decompressor=decompressor
+            )
+        elif chunk_cache_folder is not None:
+            self.recording_extractor = ChunkCachedRecording(
+                recording=self.recording_extractor,
+                chunk_cache=get_streamed_chunk_cache(cache_folder=chunk_cache_folder, quota_gb=chunk_cache_gb),
+                decompressor=decompressor,
+            )
+        if prefetch_buffers > 0:
+            self.recording_extractor = PrefetchingRecording(
+                recording=self.recording_extractor,
+                prefetch_buffers=prefetch_buffers,
+                end_frame=self.subset_recording(stub_test=True).get_num_samples(segment_index=0) if stub_test else None,
+            )
+            self._readers.callback(self.recording_extractor.close)
+        try:
+            super().add_to_nwbfile(
+                nwbfile=nwbfile,
+                metadata=metadata,
+                stub_test=stub_test,
+                starting_time=starting_time,
+                write_as=write_as,
+                write_electrical_series=write_electrical_series,
+                iterator_type=iterator_type,
+                iterator_opts=streaming_iterator_opts,
+                always_write_timestamps=always_write_timestamps,
             )
+        finally:
+            self.recording_extractor = recording_extractor
+
+    def run_conversion(self, *args, **kwargs):
+        try:
+            return super().run_conversion(*args, **kwargs)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Release the threads and processes reading the traces for `add_to_nwbfile`, once the file has been written.
+
+        The traces are only read when the file is written, after `add_to_nwbfile` returns, so the converter running
+        the conversion calls this in its `finally`.
+        """
+        self._readers.close()
+
+    def fill_chunk_cache(
+        self,
+        chunk_cache_folder: DirectoryPath,
+        chunk_cache_gb: float = 50.0,
+        stub_test: bool = False,
+        stop_event: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Download the compressed chunks of this stream into the chunk cache used by `add_to_nwbfile`.
+
+        Run from a background thread while other streams are written, the data of this stream is then read from disk
+        by the time it is written. Nothing is downloaded if the whole '.cbin' file of the stream is in the local cache
+        of ONE, as `add_to_nwbfile` then reads it instead.
+
+        Parameters
+        ----------
+        chunk_cache_folder : DirectoryPath
+            The chunk cache folder, which should also be passed to `add_to_nwbfile`.
+        chunk_cache_gb : float, default: 50.0
+            The size of the chunk cache above which the least recently read chunks are removed.
+        stub_test : bool, default: False
+            Whether to fill only the chunks written in a stub test.
+        stop_event : threading.Event, optional
+            When set, the fill stops after the chunk in progress.
+        """
+        if get_local_cbin_file_path(recording=self.recording_extractor) is not None:
+            return
+
+        recording = self.subset_recording(stub_test=True) if stub_test else self.recording_extractor
+        chunk_cache = get_streamed_chunk_cache(cache_folder=chunk_cache_folder, quota_gb=chunk_cache_gb)
+        chunk_cache.fill(
+            streamer=get_file_streamer(recording=self.recording_extractor),
+            end_frame=recording.get_num_samples(segment_index=0),
+            stop_event=stop_event,
         )
-        kwargs["iterator_opts"].update(iterator_opts)
-        if "progress_position" in kwargs:
-            kwargs.pop("progress_position")
-        super().add_to_nwbfile(**kwargs)
 
 
 class IblStreamingLfInterface(IblStreamingApInterface):
@@ -176,7 +349,7 @@ class IblStreamingLfInterface(IblStreamingApInterface):
         metadata = super().get_metadata()
         metadata["Ecephys"].pop("ElectrodeGroup")
 
-        ecephys_metadata = load_dict_from_file(file_path=Path(__file__).parent.parent / "_metadata" / "ecephys.yml")
+        ecephys_metadata = load_metadata_file(file_name="ecephys.yml")
 
         metadata["Ecephys"].update({self.es_key: ecephys_metadata["Ecephys"]["ElectricalSeriesLf"]})
         if len(self.available_streams) > 1:
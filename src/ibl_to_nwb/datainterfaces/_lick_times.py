@@ -5,6 +5,8 @@ from one.api import ONE
 from pynwb import NWBFile
 from pynwb.file import DynamicTable
 
+from ..tools import get_alf_object_cache
+
 
 class LickInterface(BaseDataInterface):
     def __init__(self, one: ONE, session: str):
@@ -12,7 +14,9 @@ class LickInterface(BaseDataInterface):
         self.session = session
 
     def add_to_nwbfile(self, nwbfile: NWBFile, metadata: dict):
-        licks = self.one.load_object(id=self.session, obj="licks", collection="alf")
+        licks = get_alf_object_cache(one=self.one).load_object(
+            session=self.session, obj="licks", collection="alf", attributes=["times"]
+        )
 
         lick_events_table = DynamicTable(
             name="LickTimes",
@@ -1,12 +1,18 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 import numpy as np
 from ndx_pose import PoseEstimation, PoseEstimationSeries
 from neuroconv.basedatainterface import BaseDataInterface
 from neuroconv.tools.nwb_helpers import get_module
 from one.api import ONE
-from pynwb import NWBFile
+from pynwb import NWBFile, TimeSeries
+
+from ..tools import (
+    get_alf_object_cache,
+    get_shared_timestamps,
+    set_shared_timestamps,
+)
 
 
 class IblPoseEstimationInterface(BaseDataInterface):
@@ -49,38 +55,60 @@ class IblPoseEstimationInterface(BaseDataInterface):
                 most_recent = max(revisions)
                 self.revision = most_recent.strftime("%Y-%m-%d")
 
-    def add_to_nwbfile(self, nwbfile: NWBFile, metadata: dict) -> None:
-        camera_data = self.one.load_object(
-            id=self.session, obj=self.camera_name, collection="alf", revision=self.revision
+    def add_to_nwbfile(
+        self, nwbfile: NWBFile, metadata: dict, pose_dtype: Literal["float64", "float32"] = "float64"
+    ) -> None:
+        """
+        Parameters
+        ----------
+        nwbfile : NWBFile
+        metadata : dict
+        pose_dtype : "float64" or "float32", default: "float64"
+            The dtype the positions and confidences of the markers are written with.
+        """
+        camera_data = get_alf_object_cache(one=self.one).load_object(
+            session=self.session,
+            obj=self.camera_name,
+            collection="alf",
+            revision=self.revision,
+            attributes=["dlc", "times"],
         )
         dlc_data = camera_data["dlc"]
-        timestamps = camera_data["times"]
-        number_of_frames = len(timestamps)
+        number_of_frames = len(camera_data["times"])
         body_parts = list(
-            set(field.replace("_x", "").replace("_y", "").replace("_likelihood", "") for field in dlc_data.keys())
+            dict.fromkeys(
+                column_name.rpartition("_")[0]
+                for column_name in dlc_data.keys()
+                if column_name.endswith(("_x", "_y", "_likelihood"))
+            )
         )
 
+        # All markers are gathered in one (frames x parts x 2) array; each series writes a view of it
+        pose_data = np.empty(shape=(number_of_frames, len(body_parts), 2), dtype=pose_dtype)
+        confidence = np.empty(shape=(number_of_frames, len(body_parts)), dtype=pose_dtype)
+        for body_part_index, body_part in enumerate(body_parts):
+            pose_data[:, body_part_index, 0] = dlc_data[f"{body_part}_x"]
+            pose_data[:, body_part_index, 1] = dlc_data[f"{body_part}_y"]
+            confidence[:, body_part_index] = dlc_data[f"{body_part}_likelihood"]
+
         left_right_or_body = self.camera_name[:5].rstrip("C")
-        reused_timestamps = None
+        timestamps = get_shared_timestamps(nwbfile=nwbfile, key=self.camera_name, timestamps=camera_data["times"])
         all_pose_estimation_series = list()
 
-        for body_part in body_parts:
-            body_part_data = np.empty(shape=(number_of_frames, 2))
-            body_part_data[:, 0] = dlc_data[f"{body_part}_x"]
-            body_part_data[:, 1] = dlc_data[f"{body_part}_y"]
-
+        for body_part_index, body_part in enumerate(body_parts):
             pose_estimation_series = PoseEstimationSeries(
                 name=body_part,
                 description=f"Marker placed on or around, labeled '{body_part}'.",
-                data=body_part_data,
+                data=pose_data[:, body_part_index, :],
                 unit="px",
                 reference_frame="(0,0) corresponds to the upper left corner when using width by height convention.",
-                timestamps=reused_timestamps or timestamps,
-                confidence=np.array(dlc_data[f"{body_part}_likelihood"]),
+                timestamps=timestamps,
+                confidence=confidence[:, body_part_index],
             )
             all_pose_estimation_series.append(pose_estimation_series)
 
-            reused_timestamps = all_pose_estimation_series[0]  # A trick for linking timestamps across series
+            if not isinstance(timestamps, TimeSeries):  # The first series holds the timestamps of the camera
+                timestamps = pose_estimation_series
 
         pose_estimation_kwargs = dict(
             name=f"PoseEstimation{left_right_or_body.capitalize()}Camera",
@@ -93,3 +121,4 @@ class IblPoseEstimationInterface(BaseDataInterface):
 
         camera_module = get_module(nwbfile=nwbfile, name="camera", description="Processed camera data.")
         camera_module.add(pose_estimation_container)
+        set_shared_timestamps(nwbfile=nwbfile, key=self.camera_name, time_series=all_pose_estimation_series[0])
@@ -1,15 +1,19 @@
 """Data Interface for the pupil tracking."""
 
-from pathlib import Path
-
 import numpy as np
 from neuroconv.basedatainterface import BaseDataInterface
 from neuroconv.tools.nwb_helpers import get_module
-from neuroconv.utils import load_dict_from_file
 from one.api import ONE
 from pynwb import TimeSeries
 from pynwb.behavior import PupilTracking
 
+from ..tools import (
+    get_alf_object_cache,
+    get_shared_timestamps,
+    load_metadata_file,
+    set_shared_timestamps,
+)
+
 
 class PupilTrackingInterface(BaseDataInterface):
     def __init__(self, one: ONE, session: str, camera_name: str):
@@ -20,7 +24,7 @@ class PupilTrackingInterface(BaseDataInterface):
     def get_metadata(self) -> dict:
         metadata = super().get_metadata()
 
-        pupils_metadata = load_dict_from_file(file_path=Path(__file__).parent.parent / "_metadata" / "pupils.yml")
+        pupils_metadata = load_metadata_file(file_name="pupils.yml")
         metadata.update(pupils_metadata)
 
         return metadata
@@ -28,22 +32,33 @@ class PupilTrackingInterface(BaseDataInterface):
     def add_to_nwbfile(self, nwbfile, metadata: dict):
         left_or_right = self.camera_name[:5].rstrip("C")
 
-        camera_data = self.one.load_object(id=self.session, obj=self.camera_name, collection="alf")
+        pupil_keys = ["pupilDiameter_raw", "pupilDiameter_smooth"]
+        camera_data = get_alf_object_cache(one=self.one).load_object(
+            session=self.session,
+            obj=self.camera_name,
+            collection="alf",
+            attributes=["features", "times"],
+            columns=dict(features=pupil_keys),
+        )
 
+        timestamps = get_shared_timestamps(nwbfile=nwbfile, key=self.camera_name, timestamps=camera_data["times"])
         pupil_time_series = list()
-        for ibl_key in ["pupilDiameter_raw", "pupilDiameter_smooth"]:
+        for ibl_key in pupil_keys:
             pupil_time_series.append(
                 TimeSeries(
                     name=left_or_right.capitalize() + metadata["Pupils"][ibl_key]["name"],
                     description=metadata["Pupils"][ibl_key]["description"],
                     data=np.array(camera_data["features"][ibl_key]),
-                    timestamps=camera_data["times"],
+                    timestamps=timestamps,
                     unit="px",
                 )
             )
+            if not isinstance(timestamps, TimeSeries):  # The first series holds the timestamps of the camera
+                timestamps = pupil_time_series[0]
         # Normally best practice convention would be PupilTrackingLeft or PupilTrackingRight but
         # in this case I'd say LeftPupilTracking and RightPupilTracking reads better
         pupil_tracking = PupilTracking(name=f"{left_or_right.capitalize()}PupilTracking", time_series=pupil_time_series)
 
         camera_module = get_module(nwbfile=nwbfile, name="camera", description="Processed camera data.")
         camera_module.add(pupil_tracking)
+        set_shared_timestamps(nwbfile=nwbfile, key=self.camera_name, time_series=pupil_time_series[0])
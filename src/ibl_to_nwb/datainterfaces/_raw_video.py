@@ -1,5 +1,5 @@
-from shutil import copyfile
-from typing import Literal
+from pathlib import Path
+from typing import Literal, Optional
 
 from neuroconv.basedatainterface import BaseDataInterface
 from one.api import ONE
@@ -7,6 +7,13 @@ from pydantic import DirectoryPath
 from pynwb import NWBFile
 from pynwb.image import ImageSeries
 
+from ..tools import (
+    get_alf_object_cache,
+    get_shared_timestamps,
+    set_shared_timestamps,
+    stage_file,
+)
+
 
 class RawVideoInterface(BaseDataInterface):
     def __init__(
@@ -43,37 +50,68 @@ class RawVideoInterface(BaseDataInterface):
         self.one = one
         self.session = session
         self.camera_name = camera_name
+        self._staged_video_file_path = None
 
-    def add_to_nwbfile(self, nwbfile: NWBFile, metadata: dict) -> None:
-        camera_data = self.one.load_object(id=self.session, obj=self.camera_name, collection="alf")
-        timestamps = camera_data["times"]
+    def stage_video(self) -> Optional[Path]:
+        """
+        Download the video of the camera and place it in the DANDI organization, once per interface.
 
-        left_right_or_body = self.camera_name[:5].removesuffix("C")
-        if self.one.list_datasets(eid=self.session, filename=f"raw_video_data/*{self.camera_name}*"):
-            original_video_file_path = self.one.load_dataset(
-                id=self.session, dataset=f"raw_video_data/*{self.camera_name}*", download_only=True
-            )
+        The video is linked rather than copied from the ONE cache when the file system allows, and left as is when
+        already in place, so re-running a conversion costs almost nothing.
+
+        Returns
+        -------
+        Path or None
+            The path of the staged video, or None if the session has no video for this camera.
+        """
+        if self._staged_video_file_path is not None:
+            return self._staged_video_file_path
+        if not self.one.list_datasets(eid=self.session, filename=f"raw_video_data/*{self.camera_name}*"):
+            return None
+
+        original_video_file_path = self.one.load_dataset(
+            id=self.session, dataset=f"raw_video_data/*{self.camera_name}*", download_only=True
+        )
+
+        # Rename to DANDI format and relative organization
+        dandi_video_folder_path = (
+            self._get_dandi_subject_folder_path() / f"{self._get_dandi_session_stem()}_ecephys+image"
+        )
+        dandi_video_folder_path.mkdir(parents=True, exist_ok=True)
+        dandi_video_file_path = (
+            dandi_video_folder_path / f"{self._get_dandi_session_stem()}_{self._get_video_name()}.mp4"
+        )
 
-            # Rename to DANDI format and relative organization
-            dandi_sub_stem = f"sub-{self.subject_id}"
-            dandi_subject_folder = self.nwbfiles_folder_path / dandi_sub_stem
+        # The original file stays in the ONE cache, which keeps re-runs simple
+        stage_file(source_path=original_video_file_path, destination_path=dandi_video_file_path)
+        self._staged_video_file_path = dandi_video_file_path
+        return dandi_video_file_path
 
-            dandi_sub_ses_stem = f"{dandi_sub_stem}_ses-{self.session}"
-            dandi_video_folder_path = dandi_subject_folder / f"{dandi_sub_ses_stem}_ecephys+image"
-            dandi_video_folder_path.mkdir(exist_ok=True)
+    def _get_dandi_subject_folder_path(self) -> Path:
+        return Path(self.nwbfiles_folder_path) / f"sub-{self.subject_id}"
 
-            nwb_video_name = f"OriginalVideo{left_right_or_body.capitalize()}Camera"
-            dandi_video_file_path = dandi_video_folder_path / f"{dandi_sub_ses_stem}_{nwb_video_name}.mp4"
+    def _get_dandi_session_stem(self) -> str:
+        return f"sub-{self.subject_id}_ses-{self.session}"
 
-            # A little bit of data duplication to copy, but easier for re-running since original file stays in cache
-            copyfile(src=original_video_file_path, dst=dandi_video_file_path)
+    def _get_video_name(self) -> str:
+        left_right_or_body = self.camera_name[:5].removesuffix("C")
+        return f"OriginalVideo{left_right_or_body.capitalize()}Camera"
+
+    def add_to_nwbfile(self, nwbfile: NWBFile, metadata: dict) -> None:
+        camera_data = get_alf_object_cache(one=self.one).load_object(
+            session=self.session, obj=self.camera_name, collection="alf", attributes=["times"]
+        )
+        timestamps = get_shared_timestamps(nwbfile=nwbfile, key=self.camera_name, timestamps=camera_data["times"])
 
+        dandi_video_file_path = self.stage_video()
+        if dandi_video_file_path is not None:
             image_series = ImageSeries(
-                name=nwb_video_name,
+                name=self._get_video_name(),
                 description="The original video each pose was estimated from.",
                 unit="n.a.",
-                external_file=["./" + str(dandi_video_file_path.relative_to(dandi_subject_folder))],
+                external_file=["./" + str(dandi_video_file_path.relative_to(self._get_dandi_subject_folder_path()))],
                 format="external",
                 timestamps=timestamps,
             )
             nwbfile.add_acquisition(image_series)
+            set_shared_timestamps(nwbfile=nwbfile, key=self.camera_name, time_series=image_series)
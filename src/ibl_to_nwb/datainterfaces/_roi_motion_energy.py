@@ -5,6 +5,12 @@ from neuroconv.tools.nwb_helpers import get_module
 from one.api import ONE
 from pynwb import TimeSeries
 
+from ..tools import (
+    get_alf_object_cache,
+    get_shared_timestamps,
+    set_shared_timestamps,
+)
+
 
 class RoiMotionEnergyInterface(BaseDataInterface):
     def __init__(self, one: ONE, session: str, camera_name: str):
@@ -15,9 +21,12 @@ class RoiMotionEnergyInterface(BaseDataInterface):
     def add_to_nwbfile(self, nwbfile, metadata: dict):
         left_right_or_body = self.camera_name[:5].rstrip("C")
 
-        camera_data = self.one.load_object(id=self.session, obj=self.camera_name, collection="alf")
-        motion_energy_video_region = self.one.load_object(
-            id=self.session, obj=f"{left_right_or_body}ROIMotionEnergy", collection="alf"
+        alf_object_cache = get_alf_object_cache(one=self.one)
+        camera_data = alf_object_cache.load_object(
+            session=self.session, obj=self.camera_name, collection="alf", attributes=["ROIMotionEnergy", "times"]
+        )
+        motion_energy_video_region = alf_object_cache.load_object(
+            session=self.session, obj=f"{left_right_or_body}ROIMotionEnergy", collection="alf", attributes=["position"]
         )
 
         width, height, x, y = motion_energy_video_region["position"]
@@ -34,9 +43,10 @@ class RoiMotionEnergyInterface(BaseDataInterface):
             name=f"{left_right_or_body.capitalize()}CameraMotionEnergy",
             description=description,
             data=camera_data["ROIMotionEnergy"],
-            timestamps=camera_data["times"],
+            timestamps=get_shared_timestamps(nwbfile=nwbfile, key=self.camera_name, timestamps=camera_data["times"]),
             unit="a.u.",
         )
 
         camera_module = get_module(nwbfile=nwbfile, name="camera", description="Processed camera data.")
         camera_module.add(motion_energy_series)
+        set_shared_timestamps(nwbfile=nwbfile, key=self.camera_name, time_series=motion_energy_series)
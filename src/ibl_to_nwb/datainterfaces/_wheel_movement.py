@@ -1,13 +1,18 @@
-from pathlib import Path
+from typing import Literal
 
-from brainbox.behavior import wheel as wheel_methods
 from neuroconv.basedatainterface import BaseDataInterface
 from neuroconv.tools.nwb_helpers import get_module
-from neuroconv.utils import load_dict_from_file
 from one.api import ONE
 from pynwb import TimeSeries
 from pynwb.behavior import CompassDirection, SpatialSeries
-from pynwb.epoch import TimeIntervals
+
+from ..tools import (
+    WheelKinematics,
+    WheelKinematicsDataChunkIterator,
+    build_time_intervals,
+    get_alf_object_cache,
+    load_metadata_file,
+)
 
 
 class WheelInterface(BaseDataInterface):
@@ -18,36 +23,50 @@ class WheelInterface(BaseDataInterface):
     def get_metadata(self) -> dict:
         metadata = super().get_metadata()
 
-        metadata.update(load_dict_from_file(file_path=Path(__file__).parent.parent / "_metadata" / "wheel.yml"))
+        metadata.update(load_metadata_file(file_name="wheel.yml"))
 
         return metadata
 
-    def add_to_nwbfile(self, nwbfile, metadata: dict):
-        wheel_moves = self.one.load_object(id=self.session, obj="wheelMoves", collection="alf")
-        wheel = self.one.load_object(id=self.session, obj="wheel", collection="alf")
+    def add_to_nwbfile(self, nwbfile, metadata: dict, kinematics_dtype: Literal["float64", "float32"] = "float64"):
+        """
+        Parameters
+        ----------
+        nwbfile : NWBFile
+        metadata : dict
+        kinematics_dtype : "float64" or "float32", default: "float64"
+            The dtype the velocity and acceleration are written with.
+        """
+        alf_object_cache = get_alf_object_cache(one=self.one)
+        wheel_moves = alf_object_cache.load_object(
+            session=self.session, obj="wheelMoves", collection="alf", attributes=["intervals", "peakAmplitude"]
+        )
+        wheel = alf_object_cache.load_object(
+            session=self.session, obj="wheel", collection="alf", attributes=["position", "timestamps"]
+        )
 
-        # Estimate velocity and acceleration
+        # Estimate velocity and acceleration, interpolated and filtered one block at a time as the file is written
         interpolation_frequency = 1000.0  # Hz
-        interpolated_position, interpolated_timestamps = wheel_methods.interpolate_position(
-            re_ts=wheel["timestamps"], re_pos=wheel["position"], freq=interpolation_frequency
+        kinematics = WheelKinematics(
+            timestamps=wheel["timestamps"],
+            position=wheel["position"],
+            frequency=interpolation_frequency,
+            dtype=kinematics_dtype,
         )
-        velocity, acceleration = wheel_methods.velocity_filtered(pos=interpolated_position, fs=interpolation_frequency)
+        velocity = WheelKinematicsDataChunkIterator(kinematics=kinematics, quantity="velocity")
+        acceleration = WheelKinematicsDataChunkIterator(kinematics=kinematics, quantity="acceleration")
 
         # Deterministically regular
-        interpolated_starting_time = interpolated_timestamps[0]
-        interpolated_rate = 1 / (interpolated_timestamps[1] - interpolated_timestamps[0])
+        interpolated_starting_time = kinematics.starting_time
+        interpolated_rate = kinematics.rate
 
         # Wheel intervals of movement
-        wheel_movement_intervals = TimeIntervals(
+        peak_amplitude_metadata = metadata["WheelMovement"]["columns"]["peakAmplitude"]
+        wheel_movement_intervals = build_time_intervals(
             name="WheelMovementIntervals",
             description=metadata["WheelMovement"]["description"],
-        )
-        for start_time, stop_time in wheel_moves["intervals"]:
-            wheel_movement_intervals.add_row(start_time=start_time, stop_time=stop_time)
-        wheel_movement_intervals.add_column(
-            name=metadata["WheelMovement"]["columns"]["peakAmplitude"]["name"],
-            description=metadata["WheelMovement"]["columns"]["peakAmplitude"]["description"],
-            data=wheel_moves["peakAmplitude"],
+            start_time=wheel_moves["intervals"][:, 0],
+            stop_time=wheel_moves["intervals"][:, 1],
+            columns=[dict(peak_amplitude_metadata, data=wheel_moves["peakAmplitude"])],
         )
 
         # Wheel position over time
@@ -1,11 +1,13 @@
 from pathlib import Path
 
 import numpy as np
-from numpy.testing import assert_array_equal, assert_array_less
+from numpy.testing import assert_array_equal
 from one.api import ONE
 from pandas.testing import assert_frame_equal
 from pynwb import NWBHDF5IO, NWBFile
 
+from ..tools import get_alf_object_cache
+
 
 def check_written_nwbfile_for_consistency(*, one: ONE, nwbfile_path: Path):
     """
@@ -31,23 +33,31 @@ def _check_wheel_data(*, eid: str, one: ONE, nwbfile: NWBFile, revision: str = N
     wheel_position_series = processing_module.data_interfaces["CompassDirection"].spatial_series["WheelPositionSeries"]
     wheel_movement_table = processing_module.data_interfaces["WheelMovementIntervals"][:]
 
+    alf_object_cache = get_alf_object_cache(one=one)
+    wheel = alf_object_cache.load_object(
+        session=eid, obj="wheel", collection="alf", attributes=["position", "timestamps"]
+    )
+    wheel_moves = alf_object_cache.load_object(
+        session=eid, obj="wheelMoves", collection="alf", attributes=["intervals", "peakAmplitude"]
+    )
+
     # wheel position
-    data_from_ONE = one.load_dataset(id=eid, dataset="_ibl_wheel.position", collection="alf")
+    data_from_ONE = wheel["position"]
     data_from_NWB = wheel_position_series.data[:]
     assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
     # wheel timestamps
-    data_from_ONE = one.load_dataset(id=eid, dataset="_ibl_wheel.timestamps", collection="alf")
+    data_from_ONE = wheel["timestamps"]
     data_from_NWB = wheel_position_series.timestamps[:]
     assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
     # wheel movement intervals
-    data_from_ONE = one.load_dataset(id=eid, dataset="_ibl_wheelMoves.intervals", collection="alf")
+    data_from_ONE = wheel_moves["intervals"]
     data_from_NWB = wheel_movement_table[["start_time", "stop_time"]].values
     assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
     # peak amplitude of wheel movement
-    data_from_ONE = one.load_dataset(id=eid, dataset="_ibl_wheelMoves.peakAmplitude", collection="alf")
+    data_from_ONE = wheel_moves["peakAmplitude"]
     data_from_NWB = wheel_movement_table["peak_amplitude"].values
     assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
@@ -57,7 +67,9 @@ def _check_lick_data(*, eid: str, one: ONE, nwbfile: NWBFile):
     lick_times_table = processing_module.data_interfaces["LickTimes"][:]
 
     data_from_NWB = lick_times_table["lick_time"].values
-    data_from_ONE = one.load_dataset(eid, "licks.times")
+    data_from_ONE = get_alf_object_cache(one=one).load_object(
+        session=eid, obj="licks", collection="alf", attributes=["times"]
+    )["times"]
     assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
 
@@ -66,16 +78,19 @@ def _check_roi_motion_energy_data(*, eid: str, one: ONE, nwbfile: NWBFile):
 
     camera_views = ["body", "left", "right"]
     for view in camera_views:
+        camera_data = get_alf_object_cache(one=one).load_object(
+            session=eid, obj=f"{view}Camera", collection="alf", attributes=["ROIMotionEnergy", "times"]
+        )
         camera_motion_energy = processing_module.data_interfaces[f"{view.capitalize()}CameraMotionEnergy"]
 
         # data
         data_from_NWB = camera_motion_energy.data[:]
-        data_from_ONE = one.load_dataset(eid, f"{view}Camera.ROIMotionEnergy", collection="alf")
+        data_from_ONE = camera_data["ROIMotionEnergy"]
         assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
         # timestamps
         data_from_NWB = camera_motion_energy.timestamps[:]
-        data_from_ONE = one.load_dataset(eid, f"_ibl_{view}Camera.times", collection="alf")
+        data_from_ONE = camera_data["times"]
         assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
 
@@ -85,36 +100,36 @@ def _check_pose_estimation_data(*, eid: str, one: ONE, nwbfile: NWBFile, revisio
     camera_views = ["body", "left", "right"]
     for view in camera_views:
         pose_estimation_container = processing_module.data_interfaces[f"PoseEstimation{view.capitalize()}Camera"]
+        camera_data = get_alf_object_cache(one=one).load_object(
+            session=eid, obj=f"{view}Camera", collection="alf", revision=revision, attributes=["dlc", "times"]
+        )
 
         nodes = pose_estimation_container.nodes[:]
         for node in nodes:
             # x
             data_from_NWB = pose_estimation_container.pose_estimation_series[node].data[:][:, 0]
-            data_from_ONE = one.load_dataset(eid, f"_ibl_{view}Camera.dlc.pqt", collection="alf")[f"{node}_x"].values
+            data_from_ONE = camera_data["dlc"][f"{node}_x"].values
             assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
             # y
             data_from_NWB = pose_estimation_container.pose_estimation_series[node].data[:][:, 1]
-            data_from_ONE = one.load_dataset(eid, f"_ibl_{view}Camera.dlc.pqt", collection="alf")[f"{node}_y"].values
+            data_from_ONE = camera_data["dlc"][f"{node}_y"].values
             assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
             # confidence
             data_from_NWB = pose_estimation_container.pose_estimation_series[node].confidence[:]
-            data_from_ONE = one.load_dataset(eid, f"_ibl_{view}Camera.dlc.pqt", collection="alf")[
-                f"{node}_likelihood"
-            ].values
+            data_from_ONE = camera_data["dlc"][f"{node}_likelihood"].values
             assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
             # timestamps
             data_from_NWB = pose_estimation_container.pose_estimation_series[node].timestamps[:]
-            data_from_ONE = one.load_dataset(eid, f"_ibl_{view}Camera.times", collection="alf")
+            data_from_ONE = camera_data["times"]
             assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
 
 def _check_trials_data(*, eid: str, one: ONE, nwbfile: NWBFile):
     data_from_NWB = nwbfile.trials[:]
-    data_from_ONE = one.load_dataset(eid, "_ibl_trials.table", collection="alf")
-    data_from_ONE["stimOff_times"] = one.load_dataset(eid, "_ibl_trials.stimOff_times", collection="alf")
+    data_from_ONE = get_alf_object_cache(one=one).load_object(session=eid, obj="trials", collection="alf").to_df()
     data_from_ONE.index.name = "id"
 
     naming_map = {
@@ -138,7 +153,8 @@ def _check_trials_data(*, eid: str, one: ONE, nwbfile: NWBFile):
     data_from_ONE = data_from_ONE[[naming_map[col] for col in data_from_NWB.columns]]
     data_from_ONE.columns = naming_map.keys()
 
-    assert_frame_equal(left=data_from_NWB, right=data_from_ONE)
+    # Some columns are stored with a more compact dtype, holding the same values
+    assert_frame_equal(left=data_from_NWB, right=data_from_ONE, check_dtype=False)
 
 
 def _check_pupil_tracking_data(*, eid: str, one: ONE, nwbfile: NWBFile):
@@ -147,19 +163,22 @@ def _check_pupil_tracking_data(*, eid: str, one: ONE, nwbfile: NWBFile):
     camera_views = ["left", "right"]
     for view in camera_views:
         pupil_tracking_container = processing_module.data_interfaces[f"{view.capitalize()}PupilTracking"]
+        camera_data = get_alf_object_cache(one=one).load_object(
+            session=eid,
+            obj=f"{view}Camera",
+            collection="alf",
+            attributes=["features", "times"],
+            columns=dict(features=["pupilDiameter_raw", "pupilDiameter_smooth"]),
+        )
 
         # raw
         data_from_NWB = pupil_tracking_container.time_series[f"{view.capitalize()}RawPupilDiameter"].data[:]
-        data_from_ONE = one.load_dataset(eid, f"_ibl_{view}Camera.features.pqt", collection="alf")[
-            "pupilDiameter_raw"
-        ].values
+        data_from_ONE = camera_data["features"]["pupilDiameter_raw"].values
         assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
         # smooth
         data_from_NWB = pupil_tracking_container.time_series[f"{view.capitalize()}SmoothedPupilDiameter"].data[:]
-        data_from_ONE = one.load_dataset(eid, f"_ibl_{view}Camera.features.pqt", collection="alf")[
-            "pupilDiameter_smooth"
-        ].values
+        data_from_ONE = camera_data["features"]["pupilDiameter_smooth"].values
 
         assert_array_equal(x=data_from_ONE, y=data_from_NWB)
 
@@ -207,5 +226,5 @@ def _check_spike_sorting_data(*, eid: str, one: ONE, nwbfile: NWBFile, revision:
         # more verbose but slower for more than ~20 checks
         # spike_times_from_ONE = spike_times[probe_name][spike_clusters[probe_name] == cluster_id]
 
-        # testing
-        assert_array_less(np.max((spike_times_from_ONE - spike_times_from_NWB) * 30000), 1)
+        # testing - spike times are written as-is, without a round trip through frames
+        assert_array_equal(x=spike_times_from_ONE, y=spike_times_from_NWB)
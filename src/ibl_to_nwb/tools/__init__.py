@@ -0,0 +1,68 @@
+from ._alf_object_cache import AlfObjectCache, get_alf_object_cache
+from ._alyx_metadata import AlyxMetadataCache, get_alyx_metadata_cache
+from ._atlas import (
+    RegionLookupTable,
+    get_atlas,
+    get_brain_regions,
+    get_region_lookup_table,
+    warm_atlas_cache,
+)
+from ._channels import get_probe_channels
+from ._clock_alignment import (
+    ClockAlignedRecording,
+    ClockTimestampsDataChunkIterator,
+    PiecewiseLinearClock,
+)
+from ._direct_chunk_write import ParallelChunkWriter
+from ._file_staging import stage_file
+from ._iterator_shapes import get_streaming_iterator_shapes
+from ._metadata_files import load_metadata_file
+from ._one import OPENALYX_URL, get_one
+from ._parallel_decompression import ParallelDecompressor
+from ._prefetching_recording import PrefetchingRecording
+from ._shared_timestamps import get_shared_timestamps, set_shared_timestamps
+from ._streamed_chunk_cache import (
+    ChunkCachedRecording,
+    LocalCbinRecording,
+    StreamedChunkCache,
+    get_file_streamer,
+    get_local_cbin_file_path,
+    get_streamed_chunk_cache,
+)
+from ._time_intervals import build_time_intervals
+from ._wheel_kinematics import WheelKinematics, WheelKinematicsDataChunkIterator
+
+__all__ = [
+    "AlfObjectCache",
+    "AlyxMetadataCache",
+    "ChunkCachedRecording",
+    "ClockAlignedRecording",
+    "ClockTimestampsDataChunkIterator",
+    "LocalCbinRecording",
+    "OPENALYX_URL",
+    "ParallelChunkWriter",
+    "ParallelDecompressor",
+    "PiecewiseLinearClock",
+    "PrefetchingRecording",
+    "RegionLookupTable",
+    "StreamedChunkCache",
+    "WheelKinematics",
+    "WheelKinematicsDataChunkIterator",
+    "build_time_intervals",
+    "get_alf_object_cache",
+    "get_alyx_metadata_cache",
+    "get_atlas",
+    "get_brain_regions",
+    "get_file_streamer",
+    "get_local_cbin_file_path",
+    "get_one",
+    "get_probe_channels",
+    "get_region_lookup_table",
+    "get_shared_timestamps",
+    "get_streamed_chunk_cache",
+    "get_streaming_iterator_shapes",
+    "load_metadata_file",
+    "set_shared_timestamps",
+    "stage_file",
+    "warm_atlas_cache",
+]
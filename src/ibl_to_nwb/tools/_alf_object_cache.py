@@ -0,0 +1,201 @@
+"""An in-memory cache of the ALF objects loaded through ONE, shared by every interface and check of a conversion."""
+
+import threading
+import weakref
+from collections import OrderedDict, defaultdict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet
+from one.alf.io import AlfBunch, load_file_content
+from one.alf.path import ALFPath
+from one.api import ONE
+
+_lock = threading.Lock()
+_object_caches = weakref.WeakKeyDictionary()
+
+
+def get_alf_object_cache(one: ONE, memory_gb: float = 2.0) -> "AlfObjectCache":
+    """
+    Retrieve the ALF object cache of this process for a ONE client, so all interfaces share the objects it holds.
+
+    The memory quota is that of the first request for the client.
+    """
+    with _lock:
+        if one not in _object_caches:
+            _object_caches[one] = AlfObjectCache(one=one, memory_gb=memory_gb)
+    return _object_caches[one]
+
+
+def _get_nbytes(value) -> int:
+    """The approximate memory held by a loaded ALF attribute."""
+    if isinstance(value, np.memmap):  # Read from disk on access
+        return 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, dict):
+        return sum(_get_nbytes(value=item) for item in value.values())
+    return 0
+
+
+class AlfObjectCache:
+    """
+    Least-recently-used cache of ALF objects, keyed by session, object, collection and revision, within a memory quota.
+
+    Several interfaces read the same object, such as the camera objects used for pose estimation, pupil tracking,
+    motion energy and raw video, as do the consistency checks of the written file. Each object is loaded and parsed
+    once; the objects returned are shared and must not be modified.
+
+    Callers needing only some attributes of an object, or some columns of its tables, can request just these: only
+    their files are downloaded, tables are read with column projection and arrays are memory-mapped rather than read.
+    Projected attributes are cached one by one, so an attribute requested by several callers, such as the times of a
+    camera, is read once.
+    """
+
+    def __init__(self, one: ONE, memory_gb: float = 2.0):
+        """
+        Parameters
+        ----------
+        one : ONE
+        memory_gb : float, default: 2.0
+            The memory held by the cached objects above which the least recently used are dropped. An object larger
+            than the quota is returned without being cached.
+        """
+        self.one = one
+        self.quota_bytes = int(memory_gb * 1e9)
+
+        self._lock = threading.Lock()
+        self._object_locks = defaultdict(threading.Lock)
+        self._objects = OrderedDict()  # Least recently used first, to (object, size in bytes)
+        self._total_bytes = 0
+
+    def load_object(
+        self,
+        session: str,
+        obj: str,
+        collection: Optional[str] = "alf",
+        revision: Optional[str] = None,
+        attributes: Optional[list] = None,
+        columns: Optional[dict] = None,
+    ) -> AlfBunch:
+        """
+        Load an ALF object of a session, as `ONE.load_object` would, parsing its files only on first use.
+
+        Parameters
+        ----------
+        session : str
+            The session ID (EID in ONE).
+        obj : str
+            The ALF object, such as 'trials' or 'leftCamera'.
+        collection : str, default: "alf"
+        revision : str, optional
+            If not specified, the latest revision is loaded.
+        attributes : list of str, optional
+            The attributes to load, such as ['times', 'features']. If not specified, the whole object is loaded.
+        columns : dict, optional
+            The columns to read from table attributes, keyed by attribute, such as {'features': ['pupilDiameter_raw']}.
+            Other tables are read whole.
+
+        Returns
+        -------
+        one.alf.io.AlfBunch
+        """
+        if attributes is not None:
+            return self._load_attributes(
+                session=session,
+                obj=obj,
+                collection=collection,
+                revision=revision,
+                attributes=attributes,
+                columns=columns or dict(),
+            )
+
+        object_key = (str(session), obj, collection, revision)
+        with self._object_locks[object_key]:  # Concurrent requests for the same object wait for a single load
+            with self._lock:
+                if object_key in self._objects:
+                    self._objects.move_to_end(object_key)
+                    return self._objects[object_key][0]
+
+            alf_object = self.one.load_object(id=session, obj=obj, collection=collection, revision=revision)
+            self._add_object(object_key=object_key, alf_object=alf_object)
+            return alf_object
+
+    def _load_attributes(
+        self,
+        session: str,
+        obj: str,
+        collection: Optional[str],
+        revision: Optional[str],
+        attributes: list,
+        columns: dict,
+    ) -> AlfBunch:
+        attribute_keys = {
+            attribute: (
+                str(session),
+                obj,
+                collection,
+                revision,
+                attribute,
+                tuple(columns[attribute]) if attribute in columns else None,
+            )
+            for attribute in attributes
+        }
+
+        alf_object = AlfBunch()
+        with self._object_locks[(str(session), obj, collection, revision)]:
+            with self._lock:
+                for attribute, attribute_key in attribute_keys.items():
+                    if attribute_key in self._objects:
+                        self._objects.move_to_end(attribute_key)
+                        alf_object[attribute] = self._objects[attribute_key][0]
+
+            missing_attributes = [attribute for attribute in attributes if attribute not in alf_object]
+            if not missing_attributes:
+                return alf_object
+
+            file_paths = self.one.load_object(
+                id=session,
+                obj=obj,
+                collection=collection,
+                revision=revision,
+                attribute=missing_attributes,
+                download_only=True,
+            )
+            for file_path in map(ALFPath, file_paths):
+                attribute = file_path.attribute
+                if attribute not in missing_attributes or file_path.timescale:
+                    continue
+
+                if file_path.suffix == ".npy":
+                    value = np.load(file=file_path, mmap_mode="r")
+                    value = value[:, 0] if value.ndim == 2 and value.shape[1] == 1 else value
+                elif file_path.suffix == ".pqt":
+                    value = pyarrow.parquet.read_table(file_path, columns=columns.get(attribute)).to_pandas()
+                else:
+                    value = load_file_content(file_path)
+
+                alf_object[attribute] = value
+                self._add_object(object_key=attribute_keys[attribute], alf_object=value)
+
+        return alf_object
+
+    def clear(self) -> None:
+        with self._lock:
+            self._objects.clear()
+            self._total_bytes = 0
+
+    def _add_object(self, object_key: tuple, alf_object) -> None:
+        object_bytes = _get_nbytes(value=alf_object)
+        if object_bytes > self.quota_bytes:
+            return
+
+        with self._lock:
+            self._objects[object_key] = (alf_object, object_bytes)
+            self._total_bytes += object_bytes
+            while self._total_bytes > self.quota_bytes:
+                _, (_, evicted_bytes) = self._objects.popitem(last=False)
+                self._total_bytes -= evicted_bytes
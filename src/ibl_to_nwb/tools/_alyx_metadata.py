@@ -0,0 +1,199 @@
+"""An on-disk cache of the Alyx records of sessions, labs and subjects used to build the metadata of NWB files."""
+
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+from one.api import ONE
+from pydantic import FilePath
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_lock = threading.Lock()
+_metadata_caches = weakref.WeakKeyDictionary()
+
+
+def get_alyx_metadata_cache(
+    one: ONE, cache_file_path: Optional[FilePath] = None, time_to_live_hours: float = 24.0
+) -> "AlyxMetadataCache":
+    """
+    Retrieve the Alyx metadata cache of this process for a ONE client, so all converters share its records.
+
+    The cache file and time to live are those of the first request for the client.
+    """
+    with _lock:
+        if one not in _metadata_caches:
+            _metadata_caches[one] = AlyxMetadataCache(
+                one=one, cache_file_path=cache_file_path, time_to_live_hours=time_to_live_hours
+            )
+    return _metadata_caches[one]
+
+
+class AlyxMetadataCache:
+    """
+    The session, lab and subject records of sessions from Alyx, kept in a JSON file and refreshed after a time to live.
+
+    Records are fetched for many sessions at once: all labs come from a single request, each subject is requested
+    once however many of its sessions are fetched, and the requests run concurrently. Later conversions, and repeated
+    calls to `get_metadata`, read the records from the file without contacting Alyx.
+
+    Several conversions may share the file: each save merges in the records saved by the others, keeping the most
+    recently fetched of each, and replaces the file atomically. A file that cannot be parsed is treated as empty.
+    """
+
+    def __init__(self, one: ONE, cache_file_path: Optional[FilePath] = None, time_to_live_hours: float = 24.0):
+        """
+        Parameters
+        ----------
+        one : ONE
+        cache_file_path : FilePath, optional
+            The JSON file holding the records. Defaults to 'alyx_metadata.json' in the cache folder of ONE.
+        time_to_live_hours : float, default: 24.0
+            The age in hours after which a record is fetched again.
+        """
+        self.one = one
+        self.cache_file_path = (
+            Path(cache_file_path) if cache_file_path is not None else Path(one.cache_dir) / "alyx_metadata.json"
+        )
+        self.time_to_live_seconds = time_to_live_hours * 3600
+
+        self._lock = threading.Lock()
+        self._records = dict(sessions=dict(), labs=dict(), subjects=dict())  # Record type to key to (time, record)
+        self._merge(records=self._read())
+
+    def fetch(self, sessions: list, max_workers: int = 8) -> None:
+        """
+        Fetch the records of sessions, and of their labs and subjects, that are missing or expired.
+
+        Parameters
+        ----------
+        sessions : list of str
+            The session IDs (EIDs in ONE).
+        max_workers : int, default: 8
+            The number of requests sent to Alyx at the same time.
+        """
+        sessions_to_fetch = list(
+            dict.fromkeys(str(session) for session in sessions if self._is_expired("sessions", session))
+        )
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            session_records = list(executor.map(self._request_session, sessions_to_fetch))
+            self._store(record_type="sessions", records={record["id"]: record for record in session_records})
+
+            session_records = [self._records["sessions"][str(session)][1] for session in sessions]
+            if any(self._is_expired("labs", record["lab"]) for record in session_records):
+                lab_records = self.one.alyx.rest("labs", "list")
+                self._store(record_type="labs", records={record["name"]: record for record in lab_records})
+
+            subjects_to_fetch = list(
+                dict.fromkeys(
+                    record["subject"] for record in session_records if self._is_expired("subjects", record["subject"])
+                )
+            )
+            subject_records = list(executor.map(self._request_subject, subjects_to_fetch))
+            self._store(record_type="subjects", records={record["nickname"]: record for record in subject_records})
+
+        self._save()
+
+    def get_records(self, session: str) -> dict:
+        """
+        The Alyx records of a session, its lab and its subject, fetching them only if missing or expired.
+
+        Parameters
+        ----------
+        session : str
+            The session ID (EID in ONE).
+
+        Returns
+        -------
+        dict
+            The 'session', 'lab' and 'subject' records.
+        """
+        self.fetch(sessions=[session])
+
+        session_record = self._records["sessions"][str(session)][1]
+        lab_record = self._records["labs"].get(session_record["lab"])
+        assert lab_record is not None, f"No lab metadata returned for '{session_record['lab']}'."
+        return dict(
+            session=session_record,
+            lab=lab_record[1],
+            subject=self._records["subjects"][session_record["subject"]][1],
+        )
+
+    def _is_expired(self, record_type: str, key: str) -> bool:
+        with self._lock:
+            fetch_time, _ = self._records[record_type].get(str(key), (None, None))
+        return fetch_time is None or time.time() - fetch_time > self.time_to_live_seconds
+
+    def _request_session(self, session: str) -> dict:
+        session_metadata_list = self.one.alyx.rest(url="sessions", action="list", id=session)
+        assert len(session_metadata_list) == 1, "More than one session metadata returned by query."
+        session_metadata = session_metadata_list[0]
+        assert session_metadata["id"] == session, "Session metadata ID does not match the requested session ID."
+        return session_metadata
+
+    def _request_subject(self, subject: str) -> dict:
+        subject_metadata_list = self.one.alyx.rest("subjects", "list", nickname=subject)
+        assert len(subject_metadata_list) == 1, "More than one subject metadata returned by query."
+        return subject_metadata_list[0]
+
+    def _store(self, record_type: str, records: dict) -> None:
+        fetch_time = time.time()
+        with self._lock:
+            self._records[record_type].update({key: (fetch_time, record) for key, record in records.items()})
+
+    def _read(self) -> dict:
+        """The records saved in the file, or none if it is missing or cannot be parsed."""
+        try:
+            with open(self.cache_file_path, mode="r") as file:
+                records = json.load(file)
+        except (FileNotFoundError, ValueError):  # Including json.JSONDecodeError
+            return dict()
+        return records if isinstance(records, dict) else dict()
+
+    def _merge(self, records: dict) -> None:
+        """Add records, keeping the most recently fetched of each."""
+        with self._lock:
+            for record_type, cached_records in self._records.items():
+                for key, (fetch_time, record) in records.get(record_type, dict()).items():
+                    if key not in cached_records or cached_records[key][0] < fetch_time:
+                        cached_records[key] = (fetch_time, record)
+
+    def _save(self) -> None:
+        """Merge in the records saved by other conversions, then replace the file through a temporary file."""
+        self.cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock_file():
+            self._merge(records=self._read())
+            file_descriptor, temporary_file_path = tempfile.mkstemp(
+                dir=self.cache_file_path.parent, prefix=f".{self.cache_file_path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(file_descriptor, mode="w") as file, self._lock:
+                    json.dump(self._records, file)
+                os.replace(temporary_file_path, self.cache_file_path)
+            except BaseException:
+                os.unlink(temporary_file_path)
+                raise
+
+    @contextlib.contextmanager
+    def _lock_file(self) -> Iterator[None]:
+        """Hold an exclusive lock across processes while reading and replacing the file, where supported."""
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.cache_file_path.with_name(f"{self.cache_file_path.name}.lock"), mode="a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
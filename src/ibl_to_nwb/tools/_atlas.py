@@ -0,0 +1,126 @@
+"""Process-wide atlas objects shared by every interface of a conversion."""
+
+import threading
+from typing import Literal
+
+import numpy as np
+from iblatlas.atlas import AllenAtlas
+from iblatlas.regions import BrainRegions
+
+_lock = threading.Lock()
+_shared_atlas_objects = dict()
+
+
+def get_atlas() -> AllenAtlas:
+    """
+    Retrieve the Allen atlas of this process, building it on first use.
+
+    Loading the atlas volume takes seconds and hundreds of MB, so all interfaces should share this instance rather
+    than constructing their own.
+
+    Returns
+    -------
+    atlas : iblatlas.atlas.AllenAtlas
+    """
+    with _lock:
+        if "atlas" not in _shared_atlas_objects:
+            _shared_atlas_objects["atlas"] = AllenAtlas()
+    return _shared_atlas_objects["atlas"]
+
+
+def get_brain_regions() -> BrainRegions:
+    """
+    Retrieve the brain region ontology of this process, building it on first use.
+
+    Returns
+    -------
+    brain_regions : iblatlas.regions.BrainRegions
+    """
+    with _lock:
+        if "brain_regions" not in _shared_atlas_objects:
+            _shared_atlas_objects["brain_regions"] = BrainRegions()
+    return _shared_atlas_objects["brain_regions"]
+
+
+def get_region_lookup_table() -> "RegionLookupTable":
+    """
+    Retrieve the region lookup table of this process, building it from the shared brain regions on first use.
+
+    Returns
+    -------
+    region_lookup_table : RegionLookupTable
+    """
+    brain_regions = get_brain_regions()
+    with _lock:
+        if "region_lookup_table" not in _shared_atlas_objects:
+            _shared_atlas_objects["region_lookup_table"] = RegionLookupTable(brain_regions=brain_regions)
+    return _shared_atlas_objects["region_lookup_table"]
+
+
+def warm_atlas_cache() -> None:
+    """
+    Build the shared atlas objects ahead of time.
+
+    Call this in the parent process before starting a pool of forked workers so each worker inherits the loaded
+    atlas through copy-on-write memory instead of loading its own.
+    """
+    get_atlas()
+    get_region_lookup_table()
+
+
+class RegionLookupTable:
+    """
+    Precomputed mapping of atlas ids to Allen, Beryl and Cosmos acronyms.
+
+    Each mapping is stored as an integer code per region and the sorted array of distinct acronyms (the categories),
+    so labelling a set of channels or units is a binary search on the ids followed by array gathers, with the result
+    as a fixed-width string array rather than a list of string objects.
+    """
+
+    mapping_names = ("Allen", "Beryl", "Cosmos")
+
+    def __init__(self, brain_regions: BrainRegions):
+        self._id_order = np.argsort(brain_regions.id, kind="stable")
+        self._sorted_ids = brain_regions.id[self._id_order]
+
+        self.categories = dict()
+        self._codes_by_region = dict()
+        for mapping in self.mapping_names:
+            acronyms = brain_regions.acronym[brain_regions.mappings[mapping]].astype(str)
+            self.categories[mapping], self._codes_by_region[mapping] = np.unique(acronyms, return_inverse=True)
+
+    def get_codes(self, atlas_ids: np.ndarray, mapping: Literal["Allen", "Beryl", "Cosmos"]) -> np.ndarray:
+        """
+        Map atlas ids to the integer codes of their acronyms under a mapping.
+
+        Parameters
+        ----------
+        atlas_ids : numpy.ndarray
+            The atlas ids, such as the 'atlas_id' of the channels of a probe.
+        mapping : "Allen", "Beryl", or "Cosmos"
+            The region mapping to remap the ids with.
+
+        Returns
+        -------
+        codes : numpy.ndarray
+            Indices into `categories[mapping]`, one per atlas id.
+        """
+        atlas_ids = np.asarray(atlas_ids)
+        positions = np.searchsorted(self._sorted_ids, atlas_ids)
+        positions[positions == len(self._sorted_ids)] = 0
+        unknown_ids = self._sorted_ids[positions] != atlas_ids
+        if np.any(unknown_ids):
+            raise ValueError(f"Atlas ids {np.unique(atlas_ids[unknown_ids])} are not part of the brain regions.")
+
+        return self._codes_by_region[mapping][self._id_order[positions]]
+
+    def get_acronyms(self, atlas_ids: np.ndarray, mapping: Literal["Allen", "Beryl", "Cosmos"]) -> np.ndarray:
+        """
+        Map atlas ids to the acronyms of their regions under a mapping; equivalent to `BrainRegions.id2acronym`.
+
+        Returns
+        -------
+        acronyms : numpy.ndarray
+            A fixed-width string array with one acronym per atlas id.
+        """
+        return self.categories[mapping][self.get_codes(atlas_ids=atlas_ids, mapping=mapping)]
@@ -0,0 +1,53 @@
+"""Cache of probe channel geometry and histology shared by the recording and sorting interfaces."""
+
+import threading
+from collections import defaultdict
+from typing import Tuple
+
+from brainbox.io.one import SpikeSortingLoader
+from iblutil.util import Bunch
+from one.api import ONE
+
+from ._atlas import get_atlas
+
+_lock = threading.Lock()
+_probe_locks = defaultdict(threading.Lock)
+_probe_channels = dict()
+
+
+def get_probe_channels(one: ONE, session: str, probe_name: str, spike_sorter: str = "iblsorter") -> Tuple[Bunch, str]:
+    """
+    Retrieve the channels of a probe, loading them on first use without loading any spikes or clusters.
+
+    The AP and LF interfaces and the sorting extractor of a probe all need the same channel locations, so they are
+    loaded once per process for each ONE database, cache folder, session and probe.
+
+    Parameters
+    ----------
+    one : one.api.ONE
+    session : str
+        The session ID (EID in ONE).
+    probe_name : str
+        The probe name, such as 'probe00'.
+    spike_sorter : str, default: "iblsorter"
+        The spike sorter whose collection holds the channels, as in `SpikeSortingLoader.load_spike_sorting`.
+
+    Returns
+    -------
+    channels : iblutil.util.Bunch
+        The channel geometry and, if available, locations, as returned by `SpikeSortingLoader.load_channels`.
+    histology : str
+        The source of the channel locations, such as 'alf' or 'resolved'; empty if there is no histology.
+    """
+    probe_key = (one.alyx.base_url, str(one.cache_dir), session, probe_name, spike_sorter)
+    with _lock:
+        probe_lock = _probe_locks[probe_key]
+
+    with probe_lock:  # Concurrent requests for the same probe wait for a single load
+        if probe_key not in _probe_channels:
+            sorting_loader = SpikeSortingLoader(
+                eid=session, one=one, pname=probe_name, atlas=get_atlas(), spike_sorter=spike_sorter
+            )
+            channels = sorting_loader.load_channels()
+            _probe_channels[probe_key] = (channels, sorting_loader.histology)
+    return _probe_channels[probe_key]
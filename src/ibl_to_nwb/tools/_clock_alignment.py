@@ -0,0 +1,211 @@
+"""Alignment of probe samples to the session clock through the piecewise-linear model of the probe sync."""
+
+from typing import Optional, Tuple
+
+import numpy as np
+from hdmf.data_utils import GenericDataChunkIterator
+from spikeinterface.core import BaseRecording, BaseRecordingSegment
+
+
+class PiecewiseLinearClock:
+    """
+    The sync model of a probe: session times interpolated linearly between sync points and extrapolated beyond them.
+
+    This is the model behind `SpikeSortingLoader.samples2times`, held as its few sync points rather than as a
+    timestamp per sample, so times are only computed for the frames that are asked for.
+    """
+
+    def __init__(self, sync_samples: np.ndarray, sync_times: np.ndarray, sample_scale: float = 1.0):
+        """
+        Parameters
+        ----------
+        sync_samples : numpy.ndarray
+            The sample indices of the sync points, in samples of the AP band; the first column of the
+            '_spikeglx_*.timestamps.npy' dataset of a probe.
+        sync_times : numpy.ndarray
+            The session times of the sync points, in seconds; the second column of the same dataset.
+        sample_scale : float, default: 1.0
+            The number of AP samples per frame of the band to align, such as 12 for the LF band.
+        """
+        assert len(sync_samples) >= 2, "At least two sync points are needed to define the clock of a probe."
+
+        self.sync_samples = np.asarray(sync_samples, dtype="float64")
+        self.sync_times = np.asarray(sync_times, dtype="float64")
+        self.sample_scale = float(sample_scale)
+
+    def get_times(self, start_frame: int, end_frame: int) -> np.ndarray:
+        """The session times of frames `start_frame` to `end_frame` of the band."""
+        return self._interpolate(frames=np.arange(start_frame, end_frame, dtype="float64"))
+
+    def get_linear_fit(self, number_of_frames: int) -> Tuple[float, float, float]:
+        """
+        Fit a single starting time and rate to the clock over the frames of a band.
+
+        The difference between the clock and a line is itself piecewise-linear, so its largest value over the
+        recording is found among the sync points and the first and last frames.
+
+        Returns
+        -------
+        starting_time : float
+            The fitted session time of the first frame, in seconds.
+        rate : float
+            The fitted sampling rate, in Hz.
+        max_deviation : float
+            The largest difference between the clock and the fit over the recording, in seconds.
+        """
+        sync_frames = self.sync_samples / self.sample_scale
+        frames = np.concatenate(
+            ([0, number_of_frames - 1], sync_frames[(sync_frames > 0) & (sync_frames < number_of_frames - 1)])
+        )
+        times = self._interpolate(frames=frames)
+
+        period, starting_time = np.polyfit(frames, times, deg=1)
+        max_deviation = float(np.max(np.abs(times - (starting_time + period * frames))))
+
+        return float(starting_time), float(1.0 / period), max_deviation
+
+    def _interpolate(self, frames: np.ndarray) -> np.ndarray:
+        samples = frames * self.sample_scale
+        times = np.interp(samples, self.sync_samples, self.sync_times)
+
+        # Extrapolate along the first and last segments, as `scipy.interpolate.interp1d(fill_value='extrapolate')`
+        for is_outside, (first, second) in (
+            (samples < self.sync_samples[0], (0, 1)),
+            (samples > self.sync_samples[-1], (-2, -1)),
+        ):
+            if np.any(is_outside):
+                slope = (self.sync_times[second] - self.sync_times[first]) / (
+                    self.sync_samples[second] - self.sync_samples[first]
+                )
+                times[is_outside] = self.sync_times[first] + slope * (samples[is_outside] - self.sync_samples[first])
+
+        return times
+
+
+class ClockTimestampsDataChunkIterator(GenericDataChunkIterator):
+    """Write the timestamps of a band from its clock one buffer at a time, without holding them all in memory."""
+
+    def __init__(self, clock: PiecewiseLinearClock, number_of_frames: int, offset: float = 0.0, **kwargs):
+        self.clock = clock
+        self.number_of_frames = number_of_frames
+        self.offset = offset
+        self._iterator_kwargs = kwargs
+        kwargs.setdefault("buffer_gb", 0.1)
+        super().__init__(**kwargs)
+
+    def __add__(self, offset: float) -> "ClockTimestampsDataChunkIterator":  # Such as when shifting starting times
+        return ClockTimestampsDataChunkIterator(
+            clock=self.clock,
+            number_of_frames=self.number_of_frames,
+            offset=self.offset + offset,
+            **self._iterator_kwargs,
+        )
+
+    __radd__ = __add__
+
+    def __len__(self) -> int:
+        return self.number_of_frames
+
+    def __getitem__(self, key: slice) -> np.ndarray:  # Such as when the times of a stub are taken from the whole band
+        return self._get_data(selection=(key,))
+
+    def _get_data(self, selection: tuple) -> np.ndarray:
+        frames = range(self.number_of_frames)[selection[0]]
+        return self.clock.get_times(start_frame=frames.start, end_frame=frames.stop)[:: frames.step] + self.offset
+
+    def _get_maxshape(self) -> tuple:
+        return (self.number_of_frames,)
+
+    def _get_dtype(self) -> np.dtype:
+        return np.dtype("float64")
+
+
+class ClockAlignedRecording(BaseRecording):
+    """
+    A recording whose frames are placed on the session clock, either as a starting time and rate or lazily.
+
+    With a `starting_time` and `sampling_frequency`, the recording is regular and written as such. With a `clock`,
+    `get_times` of the whole recording returns a `ClockTimestampsDataChunkIterator`, so the timestamps are computed
+    buffer by buffer as they are written (write it with `always_write_timestamps=True`).
+    """
+
+    def __init__(
+        self,
+        recording: BaseRecording,
+        starting_time: float = 0.0,
+        sampling_frequency: Optional[float] = None,
+        clock: Optional[PiecewiseLinearClock] = None,
+    ):
+        assert recording.get_num_segments() == 1, "Only single-segment recordings can be aligned to a clock."
+
+        sampling_frequency = sampling_frequency or recording.get_sampling_frequency()
+        BaseRecording.__init__(
+            self,
+            sampling_frequency=sampling_frequency,
+            channel_ids=recording.get_channel_ids(),
+            dtype=recording.get_dtype(),
+        )
+        recording.copy_metadata(self, only_main=False)
+        self.add_recording_segment(
+            ClockAlignedRecordingSegment(
+                parent_recording_segment=recording._recording_segments[0],
+                sampling_frequency=sampling_frequency,
+                starting_time=starting_time,
+                clock=clock,
+            )
+        )
+
+        self._kwargs = dict(
+            recording=recording, starting_time=starting_time, sampling_frequency=sampling_frequency, clock=clock
+        )
+
+    def frame_slice(self, start_frame: Optional[int], end_frame: Optional[int]) -> "ClockAlignedRecording":
+        """Slice the frames of the recording, keeping each frame at its time on the session clock."""
+        recording, starting_time, sampling_frequency, clock = (
+            self._kwargs[key] for key in ["recording", "starting_time", "sampling_frequency", "clock"]
+        )
+        start_frame = 0 if start_frame is None else int(start_frame)
+        if clock is not None:
+            clock = PiecewiseLinearClock(
+                sync_samples=clock.sync_samples - start_frame * clock.sample_scale,
+                sync_times=clock.sync_times,
+                sample_scale=clock.sample_scale,
+            )
+        return ClockAlignedRecording(
+            recording=recording.frame_slice(start_frame=start_frame, end_frame=end_frame),
+            starting_time=starting_time + start_frame / sampling_frequency,
+            sampling_frequency=sampling_frequency,
+            clock=clock,
+        )
+
+
+class ClockAlignedRecordingSegment(BaseRecordingSegment):
+    def __init__(
+        self,
+        parent_recording_segment: BaseRecordingSegment,
+        sampling_frequency: float,
+        starting_time: float,
+        clock: Optional[PiecewiseLinearClock] = None,
+    ):
+        BaseRecordingSegment.__init__(self, sampling_frequency=sampling_frequency, t_start=starting_time)
+        self.parent_recording_segment = parent_recording_segment
+        self.clock = clock
+
+    def get_num_samples(self) -> int:
+        return self.parent_recording_segment.get_num_samples()
+
+    def get_traces(self, start_frame: int, end_frame: int, channel_indices) -> np.ndarray:
+        return self.parent_recording_segment.get_traces(
+            start_frame=start_frame, end_frame=end_frame, channel_indices=channel_indices
+        )
+
+    def get_times(self, start_frame: Optional[int] = None, end_frame: Optional[int] = None):
+        if self.clock is None:
+            return super().get_times(start_frame=start_frame, end_frame=end_frame)
+
+        number_of_frames = self.get_num_samples()
+        if start_frame is None and end_frame is None:
+            return ClockTimestampsDataChunkIterator(clock=self.clock, number_of_frames=number_of_frames)
+        start_frame = 0 if start_frame is None else int(start_frame)
+        end_frame = number_of_frames if end_frame is None else int(end_frame)
+        return self.clock.get_times(start_frame=start_frame, end_frame=end_frame)
@@ -0,0 +1,179 @@
+"""Write large iterative datasets with chunks compressed in parallel and HDF5 direct chunk writes."""
+
+import itertools
+import math
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+import h5py
+import numpy as np
+from hdmf.backends.hdf5 import H5DataIO
+from hdmf.data_utils import GenericDataChunkIterator
+from pynwb import NWBFile
+from pynwb.ecephys import ElectricalSeries
+
+
+class ParallelChunkWriter:
+    """
+    Compress the chunks of the electrical series of an NWB file in a thread pool and write them pre-compressed.
+
+    The series are first deferred, so that the NWB backend only allocates their datasets when writing the file; the
+    data is then written once the file is closed, one chunk-aligned buffer at a time, with the chunks of a buffer
+    compressed in parallel while the next buffer is read. Compression with zlib releases the GIL, so this scales with
+    the number of cores.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """
+        Parameters
+        ----------
+        max_workers : int, optional
+            The number of threads compressing chunks. Defaults to the number of cores.
+        """
+        self.max_workers = max_workers
+        self._deferred_iterators = dict()  # Object ID of a series to the iterator of its data
+
+    def defer(self, nwbfile: NWBFile) -> list:
+        """
+        Defer writing the data of every electrical series of an in-memory file that is written from an iterator.
+
+        Must be called before the file is written; the data is left empty by the backend until `write` is called.
+
+        Parameters
+        ----------
+        nwbfile : NWBFile
+
+        Returns
+        -------
+        list of str
+            The names of the deferred series.
+        """
+        deferred_series_names = list()
+        for neurodata_object in nwbfile.objects.values():
+            if not isinstance(neurodata_object, ElectricalSeries):
+                continue
+
+            data = neurodata_object.data
+            iterator = data.data if isinstance(data, H5DataIO) else data
+            if (
+                not isinstance(iterator, GenericDataChunkIterator)
+                or neurodata_object.object_id in self._deferred_iterators
+            ):
+                continue
+
+            # The backend creates the dataset at its full shape, then finds no buffer to write
+            iterator.buffer_selection_generator = iter(())
+            self._deferred_iterators[neurodata_object.object_id] = iterator
+            deferred_series_names.append(neurodata_object.name)
+
+        return deferred_series_names
+
+    def write(self, nwbfile_path: Union[str, Path]) -> None:
+        """
+        Write the data of the deferred series into the file, which must have been written and closed.
+
+        Parameters
+        ----------
+        nwbfile_path : path
+        """
+        if not self._deferred_iterators:
+            return
+
+        with h5py.File(name=nwbfile_path, mode="r+") as file, ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            groups_by_object_id = dict()
+
+            def _collect_group(_, h5_object) -> None:  # Returning a value would stop the visit
+                if isinstance(h5_object, h5py.Group) and "object_id" in h5_object.attrs:
+                    groups_by_object_id[h5_object.attrs["object_id"]] = h5_object
+
+            file.visititems(_collect_group)
+
+            for object_id, iterator in self._deferred_iterators.items():
+                _write_dataset(dataset=groups_by_object_id[object_id]["data"], iterator=iterator, pool=pool)
+
+        self._deferred_iterators.clear()
+
+
+def _get_chunk_encoding(dataset: h5py.Dataset) -> Optional[tuple]:
+    """The (shuffle, gzip level) of the filter pipeline of a dataset, or None if it is not one this module encodes."""
+    if dataset.chunks is None or dataset.fletcher32 or dataset.scaleoffset is not None:
+        return None
+    if dataset.compression not in (None, "gzip"):
+        return None
+
+    compression_level = dataset.compression_opts if dataset.compression == "gzip" else None
+    number_of_filters = int(dataset.shuffle) + int(compression_level is not None)
+    if dataset.id.get_create_plist().get_nfilters() != number_of_filters:
+        return None
+
+    return dataset.shuffle, compression_level
+
+
+def _encode_chunk(chunk: np.ndarray, shuffle: bool, compression_level: Optional[int]) -> bytes:
+    """Apply the HDF5 shuffle and deflate filters to a full chunk, in the order of the filter pipeline."""
+    chunk = np.ascontiguousarray(chunk)
+    if shuffle and chunk.itemsize > 1:
+        chunk_bytes = chunk.view(np.uint8).reshape(-1, chunk.itemsize).T.tobytes()
+    else:
+        chunk_bytes = chunk.tobytes()
+
+    return zlib.compress(chunk_bytes, compression_level) if compression_level is not None else chunk_bytes
+
+
+def _write_dataset(dataset: h5py.Dataset, iterator: GenericDataChunkIterator, pool: ThreadPoolExecutor) -> None:
+    chunk_encoding = _get_chunk_encoding(dataset=dataset)
+
+    # Buffers are rounded up to whole chunks so that no chunk is split across two of them
+    chunk_shape = dataset.chunks or iterator.chunk_shape
+    buffer_shape = tuple(
+        max(1, math.ceil(buffer_length / chunk_length)) * chunk_length
+        for buffer_length, chunk_length in zip(iterator.buffer_shape, chunk_shape)
+    )
+    buffer_selections = (
+        tuple(
+            slice(start, min(start + length, maxlength))
+            for start, length, maxlength in zip(starts, buffer_shape, dataset.shape)
+        )
+        for starts in itertools.product(
+            *(range(0, maxlength, length) for length, maxlength in zip(buffer_shape, dataset.shape))
+        )
+    )
+
+    pending_chunks = list()
+    for buffer_selection in buffer_selections:
+        buffer = np.asarray(iterator._get_data(selection=buffer_selection), dtype=dataset.dtype)
+        if chunk_encoding is None:  # Let HDF5 apply filters it does not share with this module
+            dataset[buffer_selection] = buffer
+            continue
+
+        # The previous buffer is written only once this one is read, so that its compression overlaps the read
+        encoded_chunks = list()
+        for chunk_starts in itertools.product(
+            *(
+                range(selection.start, selection.stop, length)
+                for selection, length in zip(buffer_selection, chunk_shape)
+            )
+        ):
+            chunk = buffer[
+                tuple(
+                    slice(start - selection.start, start - selection.start + length)
+                    for start, selection, length in zip(chunk_starts, buffer_selection, chunk_shape)
+                )
+            ]
+            if chunk.shape != chunk_shape:  # Edge chunks are stored at full size
+                chunk = np.pad(
+                    chunk, [(0, length - chunk_length) for length, chunk_length in zip(chunk_shape, chunk.shape)]
+                )
+            encoded_chunks.append((chunk_starts, pool.submit(_encode_chunk, chunk, *chunk_encoding)))
+
+        _write_encoded_chunks(dataset=dataset, encoded_chunks=pending_chunks)
+        pending_chunks = encoded_chunks
+
+    _write_encoded_chunks(dataset=dataset, encoded_chunks=pending_chunks)
+
+
+def _write_encoded_chunks(dataset: h5py.Dataset, encoded_chunks: list) -> None:
+    for chunk_starts, encoded_chunk in encoded_chunks:
+        dataset.id.write_direct_chunk(chunk_starts, encoded_chunk.result(), filter_mask=0)
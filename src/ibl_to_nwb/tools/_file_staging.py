@@ -0,0 +1,96 @@
+"""Place large files, such as raw videos, from the ONE cache into the output folder without copying when possible."""
+
+import errno
+import hashlib
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Literal
+
+from pydantic import FilePath
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_FICLONE = 0x40049409  # The Linux ioctl sharing the extents of a file with another (btrfs, XFS, ...)
+_UNSUPPORTED_LINK_ERRORS = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EMLINK}
+
+
+def stage_file(source_path: FilePath, destination_path: Path) -> Literal["unchanged", "reflink", "hardlink", "copy"]:
+    """
+    Place a file at a destination, sharing its data with the source when the file system allows.
+
+    In order: a destination that already is the source (a hardlink) is left as is; otherwise it is replaced by a
+    reflink (copy-on-write clone), then by a hardlink; only when neither is supported is the data copied, and a
+    destination with the same size and checksum as the source is then left as is. The destination is replaced
+    atomically, so an interrupted staging never leaves a partial file.
+
+    Parameters
+    ----------
+    source_path : FilePath
+    destination_path : Path
+
+    Returns
+    -------
+    "unchanged", "reflink", "hardlink" or "copy"
+        How the destination was staged.
+    """
+    source_path = Path(source_path)
+    destination_path = Path(destination_path)
+    if destination_path.exists() and os.path.samefile(source_path, destination_path):
+        return "unchanged"
+
+    temporary_path = destination_path.with_name(f".{destination_path.name}.staging")
+    temporary_path.unlink(missing_ok=True)
+    try:
+        if _reflink(source_path=source_path, destination_path=temporary_path):
+            os.replace(temporary_path, destination_path)
+            return "reflink"
+
+        try:
+            os.link(source_path, temporary_path)
+            os.replace(temporary_path, destination_path)
+            return "hardlink"
+        except OSError as error:
+            if error.errno not in _UNSUPPORTED_LINK_ERRORS:
+                raise
+
+        if (
+            destination_path.exists()
+            and destination_path.stat().st_size == source_path.stat().st_size
+            and _get_md5(file_path=destination_path) == _get_md5(file_path=source_path)
+        ):
+            return "unchanged"
+
+        shutil.copyfile(src=source_path, dst=temporary_path)
+        os.replace(temporary_path, destination_path)
+        return "copy"
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+
+def _reflink(source_path: Path, destination_path: Path) -> bool:
+    """Clone a file into a new one, returning whether the file system supports it."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+
+    try:
+        with open(source_path, "rb") as source_file, open(destination_path, "wb") as destination_file:
+            fcntl.ioctl(destination_file.fileno(), _FICLONE, source_file.fileno())
+        return True
+    except OSError as error:
+        destination_path.unlink(missing_ok=True)
+        if error.errno not in _UNSUPPORTED_LINK_ERRORS:
+            raise
+        return False
+
+
+def _get_md5(file_path: Path, block_size: int = 2**24) -> str:
+    md5 = hashlib.md5()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            md5.update(block)
+    return md5.hexdigest()
@@ -0,0 +1,55 @@
+"""Buffer and chunk shapes for writing streamed recordings within a memory budget."""
+
+from typing import Tuple
+
+
+def get_streaming_iterator_shapes(
+    number_of_frames: int,
+    number_of_channels: int,
+    remote_chunk_frames: int,
+    bytes_per_sample: int = 2,
+    memory_budget_gb: float = 1.0,
+    buffers_in_memory: int = 4,
+    chunk_mb: float = 10.0,
+    chunk_channels: int = 64,
+) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Choose the buffer and HDF5 chunk shapes of a streamed recording from a memory budget.
+
+    Each chunk spans one remote chunk in time, and as many channels as fit in the chunk size. Buffers span all channels
+    and as many remote chunks as the budget allows, so they are whole numbers of chunks and every remote chunk is
+    fetched and decompressed once. The budget is shared by all buffers held at once (for instance the buffer being
+    written, those being prefetched and a working copy). The last chunk along time may be partial.
+
+    Parameters
+    ----------
+    number_of_frames : int
+        The number of frames to write.
+    number_of_channels : int
+    remote_chunk_frames : int
+        The number of frames in each compressed chunk of the remote file.
+    bytes_per_sample : int, default: 2
+    memory_budget_gb : float, default: 1.0
+        The memory available for all buffers of this stream.
+    buffers_in_memory : int, default: 4
+        The number of buffers held in memory at once.
+    chunk_mb : float, default: 10.0
+        The upper bound on the size of each HDF5 chunk, met by reducing its channels (down to one).
+    chunk_channels : int, default: 64
+        The largest number of channels in each HDF5 chunk.
+
+    Returns
+    -------
+    buffer_shape : tuple of int
+    chunk_shape : tuple of int
+    """
+    chunk_frames = min(number_of_frames, remote_chunk_frames)
+    chunk_channels = min(number_of_channels, chunk_channels, int(chunk_mb * 1e6 // (chunk_frames * bytes_per_sample)))
+    chunk_channels = max(1, chunk_channels)
+
+    frame_bytes = number_of_channels * bytes_per_sample
+    buffer_bytes = memory_budget_gb * 1e9 / buffers_in_memory
+    remote_chunks_per_buffer = max(1, int(buffer_bytes // (remote_chunk_frames * frame_bytes)))
+    buffer_frames = min(number_of_frames, remote_chunks_per_buffer * remote_chunk_frames)
+
+    return (buffer_frames, number_of_channels), (chunk_frames, chunk_channels)
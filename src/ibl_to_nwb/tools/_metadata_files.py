@@ -0,0 +1,23 @@
+"""The YAML metadata files of this package, parsed once per process."""
+
+import copy
+import functools
+from pathlib import Path
+
+from neuroconv.utils import load_dict_from_file
+
+_METADATA_FOLDER_PATH = Path(__file__).parent.parent / "_metadata"
+
+
+@functools.lru_cache(maxsize=None)
+def _load_metadata_file(file_name: str) -> dict:
+    return load_dict_from_file(file_path=_METADATA_FOLDER_PATH / file_name)
+
+
+def load_metadata_file(file_name: str) -> dict:
+    """
+    Load one of the YAML files in the '_metadata' folder of this package, such as 'trials.yml'.
+
+    Each file is parsed on first use only; every call returns its own copy, which the caller is free to modify.
+    """
+    return copy.deepcopy(_load_metadata_file(file_name=file_name))
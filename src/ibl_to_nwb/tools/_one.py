@@ -0,0 +1,42 @@
+"""Registry of ONE clients shared by every interface of a conversion."""
+
+import threading
+from pathlib import Path
+from typing import Optional
+
+from one.api import ONE
+from pydantic import DirectoryPath
+
+OPENALYX_URL = "https://openalyx.internationalbrainlab.org"
+
+_lock = threading.Lock()
+_one_clients = dict()
+
+
+def get_one(
+    base_url: str = OPENALYX_URL, cache_dir: Optional[DirectoryPath] = None, password: str = "international"
+) -> ONE:
+    """
+    Retrieve the ONE client of this process for a database and cache folder, connecting on first use.
+
+    Each client holds its own Alyx session, HTTP connection pool and loaded cache tables, so interfaces should share
+    the client returned here rather than constructing their own.
+
+    Parameters
+    ----------
+    base_url : str, default: "https://openalyx.internationalbrainlab.org"
+        The URL of the Alyx database.
+    cache_dir : DirectoryPath, optional
+        The ONE cache folder. If not specified, the default of ONE is used.
+    password : str, default: "international"
+        The password used when first connecting to the database; the public OpenAlyx password by default.
+
+    Returns
+    -------
+    one : one.api.ONE
+    """
+    client_key = (base_url.rstrip("/"), str(Path(cache_dir).resolve()) if cache_dir is not None else None)
+    with _lock:
+        if client_key not in _one_clients:
+            _one_clients[client_key] = ONE(base_url=base_url, password=password, silent=True, cache_dir=cache_dir)
+    return _one_clients[client_key]
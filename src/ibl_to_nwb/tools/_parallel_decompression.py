@@ -0,0 +1,178 @@
+"""Decompression of mtscomp-compressed SpikeGLX files across processes."""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import mtscomp
+import numpy as np
+from pydantic import FilePath
+
+
+class ParallelDecompressor:
+    """
+    Decode the chunks of mtscomp-compressed ('.cbin') files in a pool of processes.
+
+    Each chunk of a read is decoded by a worker directly into a block of shared memory, at its position in the
+    output, so decoded buffers are never pickled and are returned in order. This works the same for local '.cbin'
+    files, read by `read_cbin`, and for the partial '.stream.cbin' files of streamed chunks, read by `read_segments`.
+    The pool is started on the first read and stopped by `shutdown`, or on leaving the decompressor as a context
+    manager.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        max_workers : int, optional
+            The number of worker processes. The default is the number of CPUs.
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def read_cbin(self, file_path: FilePath, start_frame: int, end_frame: int) -> np.ndarray:
+        """
+        Read frames of a '.cbin' file, decoding each of the chunks it spans in its own worker.
+
+        Parameters
+        ----------
+        file_path : FilePath
+            The '.cbin' file; its '.ch' metadata file must be next to it.
+        start_frame : int
+        end_frame : int
+
+        Returns
+        -------
+        traces : numpy.ndarray
+            The raw samples of all channels, of shape (frames, channels).
+        """
+        return self.read_segments(
+            segments=_get_cbin_segments(file_path=file_path, start_frame=start_frame, end_frame=end_frame)
+        )
+
+    def read_segments(self, segments: List[Tuple[FilePath, int, int]]) -> np.ndarray:
+        """
+        Read and concatenate frame ranges of one or more '.cbin' files, decoding each range in its own worker.
+
+        Parameters
+        ----------
+        segments : list of tuples
+            The ('.cbin' file path, start frame, end frame) of each range, in output order. Ranges should not span
+            several chunks of their file, as each chunk spanned is decoded by the same worker.
+
+        Returns
+        -------
+        traces : numpy.ndarray
+            The raw samples of all channels, of shape (total frames, channels).
+        """
+        if len(segments) == 1:  # Nothing to share out
+            return _decompress(file_path=segments[0][0], start_frame=segments[0][1], end_frame=segments[0][2])
+
+        reader = mtscomp.Reader()
+        reader.open(segments[0][0], Path(segments[0][0]).with_suffix(".ch"))
+        number_of_channels, dtype = reader.n_channels, np.dtype(reader.dtype)
+        reader.close()
+
+        segment_lengths = [int(end_frame) - int(start_frame) for _, start_frame, end_frame in segments]
+        shape = (sum(segment_lengths), number_of_channels)
+
+        shared_memory = SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        try:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            output_offsets = np.cumsum([0] + segment_lengths[:-1])
+            futures = [
+                self._executor.submit(
+                    _decompress_into_shared_memory,
+                    file_path=file_path,
+                    start_frame=int(start_frame),
+                    end_frame=int(end_frame),
+                    shared_memory_name=shared_memory.name,
+                    shape=shape,
+                    dtype=dtype.str,
+                    output_offset=int(output_offset),
+                )
+                for (file_path, start_frame, end_frame), output_offset in zip(segments, output_offsets)
+            ]
+            for future in futures:
+                future.result()
+
+            shared_traces = np.ndarray(shape=shape, dtype=dtype, buffer=shared_memory.buf)
+            traces = shared_traces.copy()
+            del shared_traces  # Release the buffer so the shared memory can be closed
+        finally:
+            shared_memory.close()
+            shared_memory.unlink()
+
+        return traces
+
+    def __enter__(self) -> "ParallelDecompressor":
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _get_cbin_segments(file_path: FilePath, start_frame: int, end_frame: int) -> List[Tuple[FilePath, int, int]]:
+    """
+    Split a read of a '.cbin' file at the bounds of its compressed chunks.
+
+    Parameters
+    ----------
+    file_path : FilePath
+        The '.cbin' file; its '.ch' metadata file must be next to it.
+    start_frame : int
+    end_frame : int
+
+    Returns
+    -------
+    segments : list of tuples
+        The ('.cbin' file path, start frame, end frame) of the part of the read within each chunk, in order.
+    """
+    reader = mtscomp.Reader()
+    reader.open(file_path, Path(file_path).with_suffix(".ch"))
+    chunk_bounds = np.asarray(reader.chunk_bounds)
+    reader.close()
+
+    chunk_starts = np.clip(chunk_bounds[:-1], start_frame, end_frame)
+    chunk_ends = np.clip(chunk_bounds[1:], start_frame, end_frame)
+    return [
+        (file_path, int(chunk_start), int(chunk_end))
+        for chunk_start, chunk_end in zip(chunk_starts, chunk_ends)
+        if chunk_end > chunk_start
+    ]
+
+
+def _decompress(file_path: FilePath, start_frame: int, end_frame: int) -> np.ndarray:
+    reader = mtscomp.Reader()
+    reader.open(file_path, Path(file_path).with_suffix(".ch"))
+    try:
+        return np.asarray(reader[start_frame:end_frame])
+    finally:
+        reader.close()
+
+
+def _decompress_into_shared_memory(
+    file_path: FilePath,
+    start_frame: int,
+    end_frame: int,
+    shared_memory_name: str,
+    shape: Tuple[int, int],
+    dtype: str,
+    output_offset: int,
+) -> None:
+    shared_memory = SharedMemory(name=shared_memory_name)  # Workers share the resource tracker of the parent
+    try:
+        shared_traces = np.ndarray(shape=shape, dtype=np.dtype(dtype), buffer=shared_memory.buf)
+        shared_traces[output_offset : output_offset + end_frame - start_frame] = _decompress(
+            file_path=file_path, start_frame=start_frame, end_frame=end_frame
+        )
+        del shared_traces
+    finally:
+        shared_memory.close()
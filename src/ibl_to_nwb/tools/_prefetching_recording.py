@@ -0,0 +1,114 @@
+"""A recording wrapper that reads the next buffers of a sequential pass in the background."""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from spikeinterface.core import BaseRecording
+from spikeinterface.preprocessing.basepreprocessor import (
+    BasePreprocessor,
+    BasePreprocessorSegment,
+)
+
+
+class PrefetchingRecording(BasePreprocessor):
+    """
+    Read ahead of a sequential pass over a recording, such as when its traces are written buffer by buffer.
+
+    Each request for a window of frames schedules the reads of the following windows of the same length on a single
+    background thread, so fetching the next buffers overlaps with compressing and writing the current one. Windows
+    are read across all channels, so requests that split the channels of a window into blocks are all served by the
+    same read.
+
+    At most `prefetch_buffers` windows beyond the current one are held in memory; requests that do not follow the
+    predicted sequence discard the pending reads and are read directly. The background thread is released at the end
+    of the pass, or by `close` when the pass stops early.
+    """
+
+    def __init__(self, recording: BaseRecording, prefetch_buffers: int = 2, end_frame: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        recording : BaseRecording
+            The recording to read from; all of its reads happen on the background thread.
+        prefetch_buffers : int, default: 2
+            The number of windows to read ahead of the one currently requested.
+        end_frame : int, optional
+            The frame the pass ends at, such as when only a stub is written; nothing is read ahead beyond it.
+            The default is the end of the recording.
+        """
+        assert prefetch_buffers > 0, f"prefetch_buffers ({prefetch_buffers}) must be greater than zero!"
+
+        BasePreprocessor.__init__(self, recording)
+        for parent_segment in recording._recording_segments:
+            self.add_recording_segment(
+                PrefetchingRecordingSegment(
+                    parent_recording_segment=parent_segment, prefetch_buffers=prefetch_buffers, end_frame=end_frame
+                )
+            )
+
+        self._kwargs = dict(recording=recording, prefetch_buffers=prefetch_buffers, end_frame=end_frame)
+
+    def close(self) -> None:
+        """Discard the pending reads and release the background thread of each segment."""
+        for recording_segment in self._recording_segments:
+            recording_segment.close()
+
+
+class PrefetchingRecordingSegment(BasePreprocessorSegment):
+    def __init__(self, parent_recording_segment, prefetch_buffers: int, end_frame: Optional[int] = None):
+        BasePreprocessorSegment.__init__(self, parent_recording_segment)
+        self.prefetch_buffers = prefetch_buffers
+        self.end_frame = end_frame
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._windows: Dict[Tuple[int, int], Future] = dict()  # Scheduled reads by (start_frame, end_frame)
+
+    def get_traces(self, start_frame: int, end_frame: int, channel_indices) -> np.ndarray:
+        num_samples = self.get_num_samples()
+        pass_end_frame = num_samples if self.end_frame is None else min(self.end_frame, num_samples)
+        start_frame = 0 if start_frame is None else int(start_frame)
+        end_frame = num_samples if end_frame is None else int(end_frame)
+        window = (start_frame, end_frame)
+
+        if window not in self._windows:  # Not the predicted sequence; drop reads that will not be requested
+            for future in self._windows.values():
+                future.cancel()
+            self._windows = {window: self._submit(window=window)}
+        traces = self._windows[window].result()
+
+        # Keep the current window for requests of its other channels, and schedule the ones that follow it
+        self._windows = {scheduled: future for scheduled, future in self._windows.items() if scheduled >= window}
+        window_length = end_frame - start_frame
+        next_start_frame = end_frame
+        for _ in range(self.prefetch_buffers):
+            if next_start_frame >= pass_end_frame:
+                break
+            next_window = (next_start_frame, min(next_start_frame + window_length, pass_end_frame))
+            if next_window not in self._windows:
+                self._windows[next_window] = self._submit(window=next_window)
+            next_start_frame = next_window[1]
+
+        if end_frame >= pass_end_frame and self._executor is not None:  # End of the pass; release the thread
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        return traces if channel_indices is None else traces[:, channel_indices]
+
+    def close(self) -> None:
+        for future in self._windows.values():
+            future.cancel()
+        self._windows = dict()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _submit(self, window: Tuple[int, int]) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PrefetchingRecording")
+        return self._executor.submit(
+            self.parent_recording_segment.get_traces,
+            start_frame=window[0],
+            end_frame=window[1],
+            channel_indices=slice(None),
+        )
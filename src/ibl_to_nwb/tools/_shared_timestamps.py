@@ -0,0 +1,62 @@
+"""Timestamps written once per file and linked from every other series sharing them."""
+
+import weakref
+from typing import Union
+
+import numpy as np
+from hdmf.data_utils import DataIO
+from pynwb import NWBFile, TimeSeries
+
+_shared_timestamps = weakref.WeakKeyDictionary()  # In-memory file to the series holding each set of timestamps
+
+
+def get_shared_timestamps(nwbfile: NWBFile, key: str, timestamps: np.ndarray) -> Union[np.ndarray, TimeSeries]:
+    """
+    The series of a file registered as holding the same timestamps of a source, to link to, or the timestamps otherwise.
+
+    Passing the result as the `timestamps` of a new series, then registering the first such series with
+    `set_shared_timestamps`, writes each set of timestamps, such as the frame times of a camera, once per file,
+    however many interfaces build series from them. Timestamps that differ from those registered for the source, such
+    as camera times of another revision, are returned as they are, so the new series writes its own.
+
+    Parameters
+    ----------
+    nwbfile : NWBFile
+        The in-memory file the new series is added to.
+    key : str
+        The source of the timestamps, such as the camera name 'leftCamera'.
+    timestamps : np.ndarray
+        The timestamps of the source, used if no series holds them.
+
+    Returns
+    -------
+    np.ndarray or TimeSeries
+    """
+    time_series = _shared_timestamps.get(nwbfile, dict()).get(key)
+    if time_series is None:
+        return timestamps
+
+    shared_timestamps = time_series.timestamps
+    if isinstance(shared_timestamps, DataIO):
+        shared_timestamps = shared_timestamps.data
+    return time_series if np.array_equal(np.asarray(shared_timestamps), np.asarray(timestamps)) else timestamps
+
+
+def set_shared_timestamps(nwbfile: NWBFile, key: str, time_series: TimeSeries) -> None:
+    """
+    Register the series holding the timestamps of a source in a file, unless one already is.
+
+    Only series whose timestamps equal those of the registered series link to it, see `get_shared_timestamps`.
+
+    Parameters
+    ----------
+    nwbfile : NWBFile
+    key : str
+        The source of the timestamps, such as the camera name 'leftCamera'.
+    time_series : TimeSeries
+        A series of the file whose own `timestamps` are those of the source.
+    """
+    linked_time_series = time_series.fields.get("timestamps")  # The `timestamps` property reads through links
+    if isinstance(linked_time_series, TimeSeries):  # Already a link; register the series it links to
+        time_series = linked_time_series
+    _shared_timestamps.setdefault(nwbfile, dict()).setdefault(key, time_series)
@@ -0,0 +1,359 @@
+"""A persistent cache of the compressed chunks of streamed SpikeGLX files."""
+
+import os
+import shutil
+import threading
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from pydantic import DirectoryPath, FilePath
+from spikeinterface.core import BaseRecording
+from spikeinterface.preprocessing.basepreprocessor import (
+    BasePreprocessor,
+    BasePreprocessorSegment,
+)
+
+from ._parallel_decompression import ParallelDecompressor, _decompress
+
+_lock = threading.Lock()
+_chunk_caches = dict()
+
+
+def get_file_streamer(recording: BaseRecording):
+    """
+    The `brainbox.io.spikeglx.Streamer` behind a recording of the IBL streaming extractor of SpikeInterface.
+
+    Neither SpikeInterface nor brainbox expose the streamer or its download of single compressed chunks publicly. Their
+    private attributes are only accessed in this module, by `_get_segment_streamer`, which checks for them and fails
+    with a clear error if they change, and `_download_chunk` (written against SpikeInterface 0.105 and ibllib 4.0).
+    """
+    streamer, _ = _get_segment_streamer(recording_segment=recording._recording_segments[0])
+    return streamer
+
+
+def _get_segment_streamer(recording_segment) -> Tuple[object, bool]:
+    """The streamer of a segment of the IBL streaming extractor, and whether the segment includes the sync channel."""
+    streamer = getattr(recording_segment, "_file_streamer", None)
+    load_sync_channel = getattr(recording_segment, "_load_sync_channel", None)
+    if streamer is None or load_sync_channel is None:
+        raise TypeError(
+            f"The recording segment '{type(recording_segment).__name__}' does not hold the '_file_streamer' and "
+            "'_load_sync_channel' of the IBL streaming extractor of SpikeInterface; the chunk cache requires a "
+            "streamed IBL recording and a compatible version of SpikeInterface."
+        )
+    for attribute in ["chunks", "file_chunks", "_download_raw_partial"]:
+        if not hasattr(streamer, attribute):
+            raise TypeError(
+                f"The streamer '{type(streamer).__name__}' has no '{attribute}'; the chunk cache requires a "
+                "compatible version of 'brainbox.io.spikeglx.Streamer' (ibllib)."
+            )
+    return streamer, load_sync_channel
+
+
+def _download_chunk(streamer, chunk_index: int) -> Path:
+    """Download a single compressed chunk of a streamed file, returning the folder holding its partial files."""
+    # The streamer may be shared by threads, so take the download folder from the reader it returns
+    download_reader, _ = streamer._download_raw_partial(first_chunk=chunk_index, last_chunk=chunk_index)
+    download_folder = Path(download_reader.file_bin).parent
+    download_reader.close()
+    return download_folder
+
+
+def get_local_cbin_file_path(recording: BaseRecording) -> Optional[Path]:
+    """
+    The whole '.cbin' file of a recording of the IBL streaming extractor, if it is in the local cache of ONE.
+
+    The streamer downloads the '.ch' metadata file of the stream into the session folder of the cache, which is also
+    where ONE keeps the '.cbin' file when it has been downloaded in full.
+    """
+    streamer = get_file_streamer(recording=recording)
+    file_path = Path(streamer.file_chunks).with_suffix(".cbin")
+    return file_path if file_path.is_file() else None
+
+
+def get_streamed_chunk_cache(cache_folder: DirectoryPath, quota_gb: float = 50.0) -> "StreamedChunkCache":
+    """
+    Retrieve the chunk cache of this process for a folder, so all readers and background fills share its index.
+
+    The quota is that of the first request for the folder.
+    """
+    cache_key = str(Path(cache_folder).resolve())
+    with _lock:
+        if cache_key not in _chunk_caches:
+            _chunk_caches[cache_key] = StreamedChunkCache(cache_folder=cache_folder, quota_gb=quota_gb)
+    return _chunk_caches[cache_key]
+
+
+class StreamedChunkCache:
+    """
+    On-disk cache of the compressed chunks of streamed SpikeGLX files, with a size quota and LRU eviction.
+
+    Each remote chunk (about one second of data) is kept as its own partial '.stream.cbin' file, under a folder keyed
+    by session, probe, band and chunk index, so any later read overlapping it is served from disk whatever the
+    buffering of the conversion that downloaded it. The least recently read chunks are removed once the cache
+    exceeds its quota; the access order survives restarts through the modification time of the chunk folders.
+
+    Chunks downloaded ahead of their reads by `fill` are never removed before being read. Instead, fills pause while
+    the unread chunks take up half of the quota, and resume as readers catch up.
+    """
+
+    def __init__(self, cache_folder: DirectoryPath, quota_gb: float = 50.0):
+        """
+        Parameters
+        ----------
+        cache_folder : DirectoryPath
+            The folder to keep the chunks in; it is created if it does not exist.
+        quota_gb : float, default: 50.0
+            The size of the cache above which the least recently read chunks are removed.
+        """
+        self.cache_folder = Path(cache_folder)
+        self.quota_bytes = int(quota_gb * 1e9)
+
+        self._lock = threading.Lock()
+        self._chunks_read = threading.Condition(self._lock)  # Notified when a chunk filled ahead is first read
+        self._chunk_locks = defaultdict(threading.Lock)
+        self._chunk_sizes = OrderedDict()  # Least recently read first
+        self._total_bytes = 0
+        self._unread_chunks = set()  # Filled ahead of their reads in this process
+        self._unread_bytes = 0
+        chunk_folders = [path for path in self.cache_folder.glob("*/*/*/chunk_*") if path.is_dir()]
+        for chunk_folder in sorted(chunk_folders, key=lambda path: path.stat().st_mtime):
+            self._add_chunk(chunk_folder=chunk_folder)
+        self._evict()  # In case the quota was lowered since the last run
+
+    def get_chunk_folder(self, session: str, probe_name: str, band: str, chunk_index: int) -> Path:
+        return self.cache_folder / session / probe_name / band / f"chunk_{chunk_index:06d}"
+
+    def read(
+        self, streamer, start_frame: int, end_frame: int, decompressor: Optional[ParallelDecompressor] = None
+    ) -> np.ndarray:
+        """
+        Read the raw samples of all channels (including sync) of a streamed file, downloading only uncached chunks.
+
+        Parameters
+        ----------
+        streamer : brainbox.io.spikeglx.Streamer
+            The streamer of the file, used to download missing chunks.
+        start_frame : int
+        end_frame : int
+        decompressor : ParallelDecompressor, optional
+            Decode the chunks of the read in parallel with this decompressor. By default, they are decoded in turn.
+
+        Returns
+        -------
+        traces : numpy.ndarray
+            The raw samples of frames `start_frame` to `end_frame`, of shape (frames, channels).
+        """
+        if end_frame <= start_frame:
+            return np.empty(shape=(0, streamer.nc), dtype=streamer.dtype)
+
+        chunk_bounds = streamer.chunks["chunk_bounds"]
+        first_chunk = max(0, np.searchsorted(chunk_bounds, start_frame, side="right") - 1)
+        last_chunk = max(0, np.searchsorted(chunk_bounds, end_frame - 1, side="right") - 1)
+
+        segments = list()  # The (file path, start frame, end frame) to decode from each cached chunk
+        for chunk_index in range(first_chunk, last_chunk + 1):
+            chunk_start_frame = chunk_bounds[chunk_index]
+            chunk_folder = self._cache_chunk(streamer=streamer, chunk_index=chunk_index, is_read=True)
+            segments.append(
+                (
+                    next(chunk_folder.glob("*.stream.cbin")),
+                    max(start_frame, chunk_start_frame) - chunk_start_frame,
+                    min(end_frame, chunk_bounds[chunk_index + 1]) - chunk_start_frame,
+                )
+            )
+
+        if decompressor is not None:
+            return decompressor.read_segments(segments=segments)
+        traces = [
+            _decompress(file_path=file_path, start_frame=segment_start_frame, end_frame=segment_end_frame)
+            for file_path, segment_start_frame, segment_end_frame in segments
+        ]
+        return traces[0] if len(traces) == 1 else np.concatenate(traces)
+
+    def fill(self, streamer, end_frame: Optional[int] = None, stop_event: Optional[threading.Event] = None) -> None:
+        """
+        Download every chunk of a streamed file that is not cached yet, in order, such as from a background thread.
+
+        Parameters
+        ----------
+        streamer : brainbox.io.spikeglx.Streamer
+        end_frame : int, optional
+            Only fill the chunks up to this frame. The default is the whole file.
+        stop_event : threading.Event, optional
+            When set, the fill stops after the chunk in progress, or while it waits for readers to catch up.
+        """
+        chunk_bounds = streamer.chunks["chunk_bounds"]
+        end_frame = chunk_bounds[-1] if end_frame is None else min(end_frame, chunk_bounds[-1])
+        last_chunk = max(0, np.searchsorted(chunk_bounds, end_frame - 1, side="right") - 1)
+        for chunk_index in range(last_chunk + 1):
+            with self._chunks_read:
+                while 0 < self._unread_bytes >= self.quota_bytes // 2 and not (stop_event and stop_event.is_set()):
+                    self._chunks_read.wait(timeout=1.0)
+            if stop_event is not None and stop_event.is_set():
+                return
+            self._cache_chunk(streamer=streamer, chunk_index=chunk_index, is_read=False)
+
+    def _cache_chunk(self, streamer, chunk_index: int, is_read: bool) -> Path:
+        band = Path(streamer.file_chunks).suffixes[-2].lstrip(".")  # Such as '_spikeglx_ephysData_g0_t0.imec0.ap.ch'
+        chunk_folder = self.get_chunk_folder(
+            session=str(streamer.eid), probe_name=streamer.pname, band=band, chunk_index=chunk_index
+        )
+
+        with self._lock:
+            chunk_lock = self._chunk_locks[chunk_folder]
+        with chunk_lock:  # A reader and a background fill of the same chunk wait for a single download
+            with self._lock:
+                is_cached = chunk_folder in self._chunk_sizes
+                if is_cached:
+                    self._chunk_sizes.move_to_end(chunk_folder)
+                if is_read and chunk_folder in self._unread_chunks:
+                    self._unread_chunks.remove(chunk_folder)
+                    self._unread_bytes -= self._chunk_sizes[chunk_folder]
+                    self._chunks_read.notify_all()
+
+            if is_cached:
+                os.utime(chunk_folder)
+            else:
+                download_folder = _download_chunk(streamer=streamer, chunk_index=chunk_index)
+                chunk_folder.parent.mkdir(parents=True, exist_ok=True)
+                if chunk_folder.exists():  # Another process cached the same chunk in the meantime
+                    shutil.rmtree(download_folder, ignore_errors=True)
+                else:
+                    shutil.move(str(download_folder), str(chunk_folder))
+
+                with self._lock:
+                    self._add_chunk(chunk_folder=chunk_folder)
+                    if not is_read:
+                        self._unread_chunks.add(chunk_folder)
+                        self._unread_bytes += self._chunk_sizes[chunk_folder]
+                    self._evict()
+
+        with self._lock:
+            self._chunk_locks.pop(chunk_folder, None)
+        return chunk_folder
+
+    def _add_chunk(self, chunk_folder: Path) -> None:
+        chunk_size = sum(file_path.stat().st_size for file_path in chunk_folder.iterdir())
+        self._total_bytes += chunk_size - self._chunk_sizes.get(chunk_folder, 0)
+        self._chunk_sizes[chunk_folder] = chunk_size
+        self._chunk_sizes.move_to_end(chunk_folder)
+
+    def _evict(self) -> None:
+        """Remove the least recently read chunks above the quota, except those not read yet and the one just added."""
+        for chunk_folder in list(self._chunk_sizes)[:-1]:
+            if self._total_bytes <= self.quota_bytes:
+                return
+            if chunk_folder in self._unread_chunks:
+                continue
+            shutil.rmtree(chunk_folder, ignore_errors=True)
+            self._total_bytes -= self._chunk_sizes.pop(chunk_folder)
+
+
+class ChunkCachedRecording(BasePreprocessor):
+    """
+    Read a streamed IBL recording through a `StreamedChunkCache` instead of downloading every read again.
+
+    The recording must be streamed by a `brainbox.io.spikeglx.Streamer`, as the IBL streaming extractors are.
+    """
+
+    def __init__(
+        self,
+        recording: BaseRecording,
+        chunk_cache: StreamedChunkCache,
+        decompressor: Optional[ParallelDecompressor] = None,
+    ):
+        BasePreprocessor.__init__(self, recording)
+        for parent_segment in recording._recording_segments:
+            _get_segment_streamer(recording_segment=parent_segment)  # Fail on construction rather than on first read
+            self.add_recording_segment(
+                ChunkCachedRecordingSegment(
+                    parent_recording_segment=parent_segment, chunk_cache=chunk_cache, decompressor=decompressor
+                )
+            )
+
+        self._kwargs = dict(recording=recording, chunk_cache=chunk_cache, decompressor=decompressor)
+
+
+class ChunkCachedRecordingSegment(BasePreprocessorSegment):
+    def __init__(
+        self,
+        parent_recording_segment,
+        chunk_cache: StreamedChunkCache,
+        decompressor: Optional[ParallelDecompressor] = None,
+    ):
+        BasePreprocessorSegment.__init__(self, parent_recording_segment)
+        self.chunk_cache = chunk_cache
+        self.decompressor = decompressor
+
+    def get_traces(self, start_frame: int, end_frame: int, channel_indices) -> np.ndarray:
+        start_frame = 0 if start_frame is None else int(start_frame)
+        end_frame = self.get_num_samples() if end_frame is None else int(end_frame)
+
+        streamer, load_sync_channel = _get_segment_streamer(recording_segment=self.parent_recording_segment)
+        traces = self.chunk_cache.read(
+            streamer=streamer, start_frame=start_frame, end_frame=end_frame, decompressor=self.decompressor
+        )
+        if not load_sync_channel:
+            traces = traces[:, :-1]
+
+        return traces if channel_indices is None else traces[:, channel_indices]
+
+
+class LocalCbinRecording(BasePreprocessor):
+    """
+    Read a recording of the IBL streaming extractor from its whole '.cbin' file, already in the local cache of ONE.
+
+    See `get_local_cbin_file_path`. With a decompressor, the chunks spanned by each read are decoded in parallel.
+    """
+
+    def __init__(
+        self,
+        recording: BaseRecording,
+        file_path: FilePath,
+        decompressor: Optional[ParallelDecompressor] = None,
+    ):
+        BasePreprocessor.__init__(self, recording)
+        for parent_segment in recording._recording_segments:
+            _, load_sync_channel = _get_segment_streamer(recording_segment=parent_segment)
+            self.add_recording_segment(
+                LocalCbinRecordingSegment(
+                    parent_recording_segment=parent_segment,
+                    file_path=file_path,
+                    load_sync_channel=load_sync_channel,
+                    decompressor=decompressor,
+                )
+            )
+
+        self._kwargs = dict(recording=recording, file_path=str(file_path), decompressor=decompressor)
+
+
+class LocalCbinRecordingSegment(BasePreprocessorSegment):
+    def __init__(
+        self,
+        parent_recording_segment,
+        file_path: FilePath,
+        load_sync_channel: bool,
+        decompressor: Optional[ParallelDecompressor] = None,
+    ):
+        BasePreprocessorSegment.__init__(self, parent_recording_segment)
+        self.file_path = Path(file_path)
+        self.load_sync_channel = load_sync_channel
+        self.decompressor = decompressor
+
+    def get_traces(self, start_frame: int, end_frame: int, channel_indices) -> np.ndarray:
+        start_frame = 0 if start_frame is None else int(start_frame)
+        end_frame = self.get_num_samples() if end_frame is None else int(end_frame)
+
+        if end_frame <= start_frame:
+            traces = _decompress(file_path=self.file_path, start_frame=0, end_frame=0)
+        elif self.decompressor is not None:
+            traces = self.decompressor.read_cbin(file_path=self.file_path, start_frame=start_frame, end_frame=end_frame)
+        else:
+            traces = _decompress(file_path=self.file_path, start_frame=start_frame, end_frame=end_frame)
+        if not self.load_sync_channel:
+            traces = traces[:, :-1]
+
+        return traces if channel_indices is None else traces[:, channel_indices]
@@ -0,0 +1,74 @@
+"""Interval tables built in one step from whole columns."""
+
+from typing import Optional
+
+import numpy as np
+from hdmf.common import VectorData
+from pynwb.epoch import TimeIntervals
+
+_DEFAULT_COLUMN_DESCRIPTIONS = {column["name"]: column["description"] for column in TimeIntervals.__columns__}
+
+
+def build_time_intervals(
+    name: str,
+    description: str,
+    start_time: np.ndarray,
+    stop_time: np.ndarray,
+    columns: Optional[list] = None,
+    start_time_description: Optional[str] = None,
+    stop_time_description: Optional[str] = None,
+) -> TimeIntervals:
+    """
+    Build a TimeIntervals table from whole arrays, instead of validating and appending one row at a time.
+
+    Parameters
+    ----------
+    name : str
+    description : str
+    start_time : np.ndarray
+        The start time of every interval, in seconds.
+    stop_time : np.ndarray
+        The stop time of every interval, in seconds.
+    columns : list of dict, optional
+        The extra columns, in order, each a dictionary with the 'name', 'description' and 'data' of the column.
+    start_time_description : str, optional
+        Defaults to the description of the column used by `TimeIntervals.add_row`.
+    stop_time_description : str, optional
+        Defaults to the description of the column used by `TimeIntervals.add_row`.
+
+    Returns
+    -------
+    TimeIntervals
+    """
+    start_time = np.asarray(start_time, dtype="float64")
+    stop_time = np.asarray(stop_time, dtype="float64")
+    columns = columns or list()
+
+    number_of_intervals = len(start_time)
+    for column_name, data in [("stop_time", stop_time)] + [(column["name"], column["data"]) for column in columns]:
+        if len(data) != number_of_intervals:
+            raise ValueError(
+                f"Column '{column_name}' of '{name}' has {len(data)} rows, but there are {number_of_intervals} "
+                "intervals."
+            )
+
+    return TimeIntervals(
+        name=name,
+        description=description,
+        columns=[
+            VectorData(
+                name="start_time",
+                description=start_time_description or _DEFAULT_COLUMN_DESCRIPTIONS["start_time"],
+                data=start_time,
+            ),
+            VectorData(
+                name="stop_time",
+                description=stop_time_description or _DEFAULT_COLUMN_DESCRIPTIONS["stop_time"],
+                data=stop_time,
+            ),
+        ]
+        + [
+            VectorData(name=column["name"], description=column["description"], data=column["data"])
+            for column in columns
+        ],
+    )
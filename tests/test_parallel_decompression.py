@@ -0,0 +1,34 @@
+import mtscomp
+import numpy as np
+import pytest
+
+from ibl_to_nwb.tools import ParallelDecompressor
+
+
+@pytest.fixture(scope="module")
+def local_cbin(tmp_path_factory):
+    """A local '.cbin' file of one second chunks, with the raw samples it compresses."""
+    folder = tmp_path_factory.mktemp("cbin")
+    sampling_frequency, number_of_channels = 1_000, 5
+    traces = np.random.default_rng(seed=0).integers(-1000, 1000, size=(3_500, number_of_channels), dtype=np.int16)
+    traces.tofile(folder / "recording.bin")
+
+    mtscomp.compress(
+        folder / "recording.bin",
+        out=folder / "recording.cbin",
+        outmeta=folder / "recording.ch",
+        sample_rate=sampling_frequency,
+        n_channels=number_of_channels,
+        dtype=traces.dtype,
+        chunk_duration=1.0,
+    )
+    return folder / "recording.cbin", traces
+
+
+@pytest.mark.parametrize("start_frame, end_frame", [(0, 3_500), (250, 2_750), (1_000, 2_000), (1_100, 1_200)])
+def test_read_cbin_round_trip(local_cbin, start_frame, end_frame):
+    file_path, traces = local_cbin
+    with ParallelDecompressor(max_workers=2) as decompressor:
+        decompressed_traces = decompressor.read_cbin(file_path=file_path, start_frame=start_frame, end_frame=end_frame)
+
+    np.testing.assert_array_equal(decompressed_traces, traces[start_frame:end_frame])
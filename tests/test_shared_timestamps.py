@@ -0,0 +1,43 @@
+import numpy as np
+from pynwb import TimeSeries
+from pynwb.testing.mock.file import mock_NWBFile
+
+from ibl_to_nwb.tools import get_shared_timestamps, set_shared_timestamps
+
+
+def _add_camera_series(nwbfile, name: str, timestamps: np.ndarray) -> TimeSeries:
+    time_series = TimeSeries(
+        name=name,
+        data=np.zeros(len(timestamps)),
+        unit="a.u.",
+        timestamps=get_shared_timestamps(nwbfile=nwbfile, key="leftCamera", timestamps=timestamps),
+    )
+    nwbfile.add_acquisition(time_series)
+    set_shared_timestamps(nwbfile=nwbfile, key="leftCamera", time_series=time_series)
+    return time_series
+
+
+def test_equal_timestamps_are_linked():
+    nwbfile = mock_NWBFile()
+    camera_times = np.arange(100) / 60.0
+    first_series = _add_camera_series(nwbfile=nwbfile, name="First", timestamps=camera_times)
+    second_series = _add_camera_series(nwbfile=nwbfile, name="Second", timestamps=camera_times.copy())
+    third_series = _add_camera_series(nwbfile=nwbfile, name="Third", timestamps=camera_times.copy())
+
+    assert second_series in first_series.timestamp_link
+    assert third_series in first_series.timestamp_link  # Not to the second series, which is itself a link
+
+
+def test_different_timestamps_are_written():
+    nwbfile = mock_NWBFile()
+    camera_times = np.arange(100) / 60.0
+    first_series = _add_camera_series(nwbfile=nwbfile, name="First", timestamps=camera_times)
+    shorter_series = _add_camera_series(nwbfile=nwbfile, name="Shorter", timestamps=camera_times[:90])
+    shifted_series = _add_camera_series(nwbfile=nwbfile, name="Shifted", timestamps=camera_times + 0.001)
+    matching_series = _add_camera_series(nwbfile=nwbfile, name="Matching", timestamps=camera_times.copy())
+
+    np.testing.assert_array_equal(shorter_series.timestamps, camera_times[:90])
+    np.testing.assert_array_equal(shifted_series.timestamps, camera_times + 0.001)
+    assert matching_series in first_series.timestamp_link
+    assert shorter_series not in first_series.timestamp_link
+    assert shifted_series not in first_series.timestamp_link